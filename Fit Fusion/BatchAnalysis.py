@@ -0,0 +1,262 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from PoseTracker import PostureAnalyzer, ExerciseEngine, LandmarkFrame, JOINT_ANGLES, calculate_angles, frame_timestamp
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# One analyzer (and so one MediaPipe Pose graph) per worker process
+_analyzer = None
+
+
+def find_videos(paths):
+    """
+    Expands the given files and directories into a sorted list of video files.
+
+    Args:
+        paths (list[str]): Video files or directories to search recursively.
+
+    Returns:
+        list[str]: Paths of every video found.
+    """
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend(os.path.join(root, name) for name in files
+                              if name.lower().endswith(VIDEO_EXTENSIONS))
+        else:
+            videos.append(path)
+    return sorted(videos)
+
+
+def _init_worker():
+    """Build the worker's PostureAnalyzer once, so its Pose graph is reused for every file."""
+    global _analyzer
+    _analyzer = PostureAnalyzer()
+
+
+def _reset_worker():
+    """Forget the tracking state of the previous file or chunk."""
+    _analyzer.pose.reset()
+    _analyzer.frame = LandmarkFrame()
+
+
+def analyze_video(video_path, angles_path):
+    """
+    Runs every exercise detector over a recorded video without any display.
+
+    Args:
+        video_path (str): Video file to analyze.
+        angles_path (str): CSV file that receives the per-frame joint angles.
+
+    Returns:
+        dict: Frame counts and each exercise's summary, or an "error" entry if the
+            video could not be opened.
+    """
+    if _analyzer is None:
+        _init_worker()
+    _reset_worker()
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"video": video_path, "error": "Could not open video."}
+
+    engine = ExerciseEngine()
+    frames, detected_frames = 0, 0
+    try:
+        with open(angles_path, "w", newline="") as angles_file:
+            writer = csv.writer(angles_file)
+            writer.writerow(["frame", "timestamp", "detected", *JOINT_ANGLES])
+
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                timestamp = frame_timestamp(cap, frames)
+                _analyzer.infer(frame, engine, timestamp=timestamp)
+
+                if _analyzer.frame.detected:
+                    detected_frames += 1
+                    angles = [f"{engine.signals[joint]:.2f}" for joint in JOINT_ANGLES]
+                else:
+                    angles = [""] * len(JOINT_ANGLES)
+                writer.writerow([frames, f"{timestamp:.3f}", int(_analyzer.frame.detected), *angles])
+                frames += 1
+    finally:
+        cap.release()
+
+    return {
+        "video": video_path,
+        "angles_csv": angles_path,
+        "frames": frames,
+        "detected_frames": detected_frames,
+        "exercises": engine.summary(),
+        "detected_exercise": engine.guess_exercise(),
+    }
+
+
+def _infer_chunk(video_path, start, end, warmup):
+    """
+    Runs pose inference on frames ``start`` to ``end`` of a video in a worker process.
+
+    Inference starts ``warmup`` frames earlier so MediaPipe's tracking has settled by
+    ``start``; the warm-up frames are not returned.
+
+    Returns:
+        tuple: (start, (frames, 33, 4) landmarks, (frames,) detected flags, (frames,) timestamps).
+    """
+    if _analyzer is None:
+        _init_worker()
+    _reset_worker()
+
+    cap = cv2.VideoCapture(video_path)
+    first = max(0, start - warmup)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    landmarks, detected, timestamps = [], [], []
+    try:
+        for index in range(first, end):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = frame_timestamp(cap, index)
+            _analyzer.infer(frame, timestamp=timestamp)
+            if index >= start:
+                landmarks.append(_analyzer.frame.data.copy())
+                detected.append(_analyzer.frame.detected)
+                timestamps.append(timestamp)
+    finally:
+        cap.release()
+
+    landmarks = np.array(landmarks, dtype=np.float32).reshape(-1, *_analyzer.frame.data.shape)
+    return start, landmarks, np.array(detected, dtype=bool), np.array(timestamps)
+
+
+def analyze_video_chunked(video_path, angles_path, workers=None, chunk_frames=300, overlap=30):
+    """
+    Analyzes one long video by splitting it into chunks that are inferred in parallel.
+
+    Each worker process runs pose inference on its chunks, starting ``overlap`` frames
+    early to warm up the tracker. The landmarks are stitched back in frame order and the
+    exercise detectors then run over the whole stream, so reps that cross a chunk
+    boundary are counted once.
+
+    Args:
+        video_path (str): Video file to analyze.
+        angles_path (str): CSV file that receives the per-frame joint angles.
+        workers (int, optional): Number of processes. Defaults to the CPU count.
+        chunk_frames (int): Frames per chunk.
+        overlap (int): Warm-up frames inferred before each chunk and then discarded.
+
+    Returns:
+        dict: The same summary as analyze_video().
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"video": video_path, "error": "Could not open video."}
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    starts = list(range(0, frame_count, chunk_frames))
+    ends = [min(start + chunk_frames, frame_count) for start in starts]
+    # Spawned rather than forked workers, a forked copy of a running Pose graph can crash
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+        # map() yields the chunks in submission order, which is frame order
+        chunks = list(executor.map(_infer_chunk, [video_path] * len(starts), starts, ends,
+                                   [overlap] * len(starts)))
+
+    landmarks = np.concatenate([chunk[1] for chunk in chunks]) if chunks else np.zeros((0, 33, 4), np.float32)
+    detected = np.concatenate([chunk[2] for chunk in chunks]) if chunks else np.zeros(0, bool)
+    timestamps = np.concatenate([chunk[3] for chunk in chunks]) if chunks else np.zeros(0)
+
+    engine = ExerciseEngine()
+    frame = LandmarkFrame()
+    for data, frame.detected, frame.timestamp in zip(landmarks, detected, timestamps):
+        frame.data[:] = data
+        engine.update(frame)
+
+    angles = calculate_angles(landmarks) if len(landmarks) else np.zeros((0, len(JOINT_ANGLES)))
+    with open(angles_path, "w", newline="") as angles_file:
+        writer = csv.writer(angles_file)
+        writer.writerow(["frame", "timestamp", "detected", *JOINT_ANGLES])
+        for i, (row, found, timestamp) in enumerate(zip(angles, detected, timestamps)):
+            values = [f"{angle:.2f}" for angle in row] if found else [""] * len(JOINT_ANGLES)
+            writer.writerow([i, f"{timestamp:.3f}", int(found), *values])
+
+    return {
+        "video": video_path,
+        "angles_csv": angles_path,
+        "frames": len(landmarks),
+        "detected_frames": int(detected.sum()),
+        "exercises": engine.summary(),
+        "detected_exercise": engine.guess_exercise(),
+    }
+
+
+def _angles_paths(videos, output_dir):
+    """Pick one angles CSV name per video, keeping names unique when file names repeat."""
+    paths, used = [], set()
+    for video in videos:
+        stem = os.path.splitext(os.path.basename(video))[0]
+        name, suffix = f"{stem}_angles.csv", 1
+        while name in used:
+            suffix += 1
+            name = f"{stem}_{suffix}_angles.csv"
+        used.add(name)
+        paths.append(os.path.join(output_dir, name))
+    return paths
+
+
+def analyze_videos(paths, output_dir, workers=None, chunked=False):
+    """
+    Analyzes recorded workout videos across a pool of worker processes.
+
+    Each worker keeps a single MediaPipe Pose graph and handles whole files. Per-frame
+    angles are written to one CSV per video and all summaries to ``summary.json``.
+
+    Args:
+        paths (list[str]): Video files or directories.
+        output_dir (str): Directory for the CSV and JSON reports.
+        workers (int, optional): Number of processes. Defaults to the CPU count.
+        chunked (bool): Split each video into chunks across all workers instead, see
+            analyze_video_chunked(). Faster for a few long videos.
+
+    Returns:
+        list[dict]: One summary per video, in input order.
+    """
+    videos = find_videos(paths)
+    os.makedirs(output_dir, exist_ok=True)
+    angles_paths = _angles_paths(videos, output_dir)
+
+    if chunked:
+        summaries = [analyze_video_chunked(video, angles_path, workers)
+                     for video, angles_path in zip(videos, angles_paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            summaries = list(executor.map(analyze_video, videos, angles_paths))
+
+    with open(os.path.join(output_dir, "summary.json"), "w") as summary_file:
+        json.dump(summaries, summary_file, indent=2)
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score recorded workout videos without a display.")
+    parser.add_argument("paths", nargs="+", help="Video files or directories of videos")
+    parser.add_argument("-o", "--output", default="analysis", help="Directory for the CSV/JSON reports")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("-c", "--chunked", action="store_true",
+                        help="Split each video into chunks across the workers (for long videos)")
+    args = parser.parse_args()
+
+    for summary in analyze_videos(args.paths, args.output, args.workers, args.chunked):
+        print(json.dumps(summary))
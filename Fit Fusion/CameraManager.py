@@ -0,0 +1,225 @@
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+# One manager per camera index, see shared_camera()
+_cameras = {}
+_cameras_lock = threading.Lock()
+
+
+def default_backend():
+    """The OpenCV capture backend that opens webcams fastest on this platform."""
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    if sys.platform == "win32":
+        return cv2.CAP_DSHOW
+    return cv2.CAP_ANY
+
+
+class CameraManager:
+    """
+    Keeps one camera handle open and fans its frames out to any number of consumers.
+
+    The camera is configured for low latency (MJPG, a one-frame driver buffer) and
+    drained continuously by a capture thread while anybody is subscribed, so a consumer
+    always gets the newest frame instead of one that waited in a queue. When the last
+    subscriber leaves, the camera is released, so the device is free (and its light
+    off) between sessions; the next open_camera() opens it again.
+    """
+
+    def __init__(self, index=0, width=640, height=480, fps=30, fourcc="MJPG", backend=None):
+        """
+        Args:
+            index (int): Camera index.
+            width (int): Requested frame width.
+            height (int): Requested frame height.
+            fps (int): Requested frame rate.
+            fourcc (str): Requested pixel format; MJPG lets USB webcams deliver higher
+                resolutions at full frame rate.
+            backend (int, optional): OpenCV backend, default_backend() when omitted.
+        """
+        self.index = index
+        self.cap = cv2.VideoCapture(index, default_backend() if backend is None else backend)
+        if not self.cap.isOpened():
+            # Fall back to whatever backend OpenCV picks by itself
+            self.cap = cv2.VideoCapture(index)
+        self._cap_lock = threading.Lock()
+        self.configure(width, height, fps, fourcc)
+
+        self._cond = threading.Condition()
+        self._buffers = [None, None]
+        self._frame = None
+        self._sequence = 0
+        self._subscribers = 0
+        self._closed = False
+        self._failed = False
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def configure(self, width=None, height=None, fps=None, fourcc=None):
+        """Apply capture settings; arguments left as None are not changed."""
+        with self._cap_lock:
+            if fourcc is not None:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            if width is not None:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            if height is not None:
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps is not None:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+            # Keep at most one frame waiting in the driver
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def isOpened(self):
+        return self.cap.isOpened() and not self._failed
+
+    def get(self, prop):
+        with self._cap_lock:
+            return self.cap.get(prop)
+
+    def _capture(self):
+        current = 0
+        while True:
+            with self._cond:
+                was_idle = not self._subscribers
+                self._cond.wait_for(lambda: self._subscribers or self._closed)
+                if self._closed:
+                    return
+            with self._cap_lock:
+                if was_idle:
+                    # Whatever the driver held while nobody was reading is stale
+                    self.cap.grab()
+                ret, frame = self.cap.read(self._buffers[current])
+            with self._cond:
+                if not ret:
+                    self._failed = True
+                    self._cond.notify_all()
+                    return
+                # Consumers copy the published frame under the lock; the next read goes
+                # into the other buffer
+                self._buffers[current] = frame
+                self._frame = frame
+                self._sequence += 1
+                self._cond.notify_all()
+            current ^= 1
+
+    def subscribe(self):
+        """A new consumer of the frames, see CameraSubscription."""
+        with self._cond:
+            self._subscribers += 1
+            self._cond.notify_all()
+            return CameraSubscription(self, self._sequence)
+
+    def _unsubscribe(self):
+        # Under the registry lock, so open_camera() cannot subscribe to a camera being closed
+        with _cameras_lock:
+            with self._cond:
+                self._subscribers -= 1
+                if self._subscribers:
+                    return
+            if _cameras.get(self.index) is self:
+                del _cameras[self.index]
+            self._release()
+
+    def _read(self, image, after, timeout):
+        """Copy the first frame newer than sequence number ``after`` into ``image``."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._sequence > after or self._failed or self._closed, timeout):
+                return False, image, after
+            if self._sequence <= after:
+                return False, image, after
+            if image is None or image.shape != self._frame.shape:
+                image = np.empty_like(self._frame)
+            np.copyto(image, self._frame)
+            return True, image, self._sequence
+
+    def _release(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._cap_lock:
+            self.cap.release()
+
+    def close(self):
+        """Stop the capture thread and release the camera."""
+        self._release()
+        with _cameras_lock:
+            if _cameras.get(self.index) is self:
+                del _cameras[self.index]
+
+
+class CameraSubscription:
+    """
+    One consumer's view of a CameraManager, usable wherever a ``cv2.VideoCapture`` is.
+
+    read() returns the newest frame that this consumer has not seen yet, and release()
+    ends the subscription; the shared camera is only released with its last one.
+    """
+
+    def __init__(self, manager, sequence=0, timeout=2.0):
+        self.manager = manager
+        self.timeout = timeout
+        self._sequence = sequence
+        self._released = False
+
+    def read(self, image=None):
+        """Like ``cv2.VideoCapture.read``: (ret, frame), copied into ``image`` when given."""
+        if self._released:
+            return False, None
+        ret, image, self._sequence = self.manager._read(image, self._sequence, self.timeout)
+        return ret, image if ret else None
+
+    def isOpened(self):
+        return not self._released and self.manager.isOpened()
+
+    def set(self, prop, value):
+        """Forwarded to the shared camera, so it changes the frames of every consumer."""
+        settings = {cv2.CAP_PROP_FRAME_WIDTH: "width", cv2.CAP_PROP_FRAME_HEIGHT: "height",
+                    cv2.CAP_PROP_FPS: "fps"}
+        if prop not in settings:
+            return False
+        self.manager.configure(**{settings[prop]: int(value)})
+        return True
+
+    def get(self, prop):
+        return self.manager.get(prop)
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.manager._unsubscribe()
+
+
+def _shared_camera(index, settings):
+    # Call with _cameras_lock held
+    manager = _cameras.get(index)
+    if manager is None or not manager.isOpened():
+        if manager is not None:
+            # The device failed, e.g. it was unplugged; reopen it
+            manager._release()
+        manager = _cameras[index] = CameraManager(index, **settings)
+    return manager
+
+
+def shared_camera(index=0, **settings):
+    """
+    The process-wide CameraManager of a camera index, opened on first use.
+
+    It is released again when its last subscriber leaves; use open_camera() to read
+    frames.
+
+    Args:
+        index (int): Camera index.
+        **settings: CameraManager options, only used when the camera is first opened.
+    """
+    with _cameras_lock:
+        return _shared_camera(index, settings)
+
+
+def open_camera(index=0, **settings):
+    """Subscribe to a shared camera; the result can stand in for ``cv2.VideoCapture(index)``."""
+    with _cameras_lock:
+        return _shared_camera(index, settings).subscribe()
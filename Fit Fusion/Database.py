@@ -190,20 +190,21 @@ def reset_streak(user_id):
 
 
 # Example Testing
-print("Welcome to Fit Fusion")
-print("1. Login \n2. Signup")
-choice = input("Press 1 for Login and 2 for Signup: ")
-
-if choice == '1':
-    email = input("Enter your Email: ")
-    password = input("Enter your password: ")
-    print(login_database(email, password))
-
-elif choice == '2':
-    email = input("Enter your Email: ")
-    password = input("Enter your password: ")
-    name = input("Enter your name: ")
-    print(signup_database(email, password, name))
-
-else:
-    print("Invalid choice.")
+if __name__ == "__main__":
+    print("Welcome to Fit Fusion")
+    print("1. Login \n2. Signup")
+    choice = input("Press 1 for Login and 2 for Signup: ")
+
+    if choice == '1':
+        email = input("Enter your Email: ")
+        password = input("Enter your password: ")
+        print(login_database(email, password))
+
+    elif choice == '2':
+        email = input("Enter your Email: ")
+        password = input("Enter your password: ")
+        name = input("Enter your name: ")
+        print(signup_database(email, password, name))
+
+    else:
+        print("Invalid choice.")
@@ -0,0 +1,161 @@
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Shared memory layout: the sequence number of the newest frame, then a ring of slots.
+# A slot's own sequence number is 0 while it is being written, so readers can tell a
+# complete frame from one the writer has lapped.
+HEADER = np.dtype([("latest", "<u8")])
+
+
+def slot_dtype(width, height, num_landmarks=33, channels=4):
+    """One frame: sequence number, timestamp, detection flag, landmarks and the BGR image."""
+    return np.dtype([("sequence", "<u8"), ("timestamp", "<f8"), ("detected", "u1"),
+                     ("landmarks", "<f4", (num_landmarks, channels)), ("image", "u1", (height, width, 3))],
+                    align=True)
+
+
+class BusFrame:
+    """
+    One published frame from the shared memory.
+
+    It has the same attributes as PoseTracker.LandmarkFrame, so exercise detectors and
+    PoseTrace.TraceRecorder accept it directly, plus the flipped BGR ``image``. The
+    landmarks are copied out of the slot when the frame is read, FrameBus.latest() only
+    returns frames whose copy is complete. The image is a view into the bus; it stays
+    intact until the writer comes round to the slot again, ``slots - 1`` frames later,
+    so copy it out before use and check valid() afterwards.
+    """
+
+    __slots__ = ("bus", "index", "sequence", "image", "data", "detected", "timestamp")
+
+    def __init__(self, bus, index, sequence):
+        self.bus = bus
+        self.index = index
+        self.sequence = sequence
+        self.image = bus.images[index]
+        self.data = bus.landmarks[index].copy()
+        self.detected = bool(bus.detected[index])
+        self.timestamp = float(bus.timestamps[index])
+
+    def valid(self):
+        """Whether the slot still holds this frame."""
+        return self.bus.sequences[self.index] == self.sequence
+
+
+class FrameBus:
+    """
+    Ring buffer of camera frames and pose landmarks in shared memory.
+
+    One process publishes, any number of threads and processes read the newest frame,
+    copying only its landmarks. Readers never block the writer: a reader that falls more than
+    ``slots - 1`` frames behind simply finds its frame overwritten (see BusFrame.valid)
+    and moves on to the newest one.
+    """
+
+    def __init__(self, width=640, height=480, slots=4, name=None, poll_interval=0.002):
+        """
+        Args:
+            width (int): Width of the published images; other sizes are scaled to it.
+            height (int): Height of the published images.
+            slots (int): Frames kept in the ring.
+            name (str, optional): Attach to the existing bus of this name instead of
+                creating one, see spec.
+            poll_interval (float): Seconds between checks for a new frame in wait().
+        """
+        self.width = width
+        self.height = height
+        self.poll_interval = poll_interval
+        dtype = slot_dtype(width, height)
+        self.owner = name is None
+        size = HEADER.itemsize + slots * dtype.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.header = np.ndarray((), HEADER, buffer=self.shm.buf)
+        slots_array = np.ndarray((slots,), dtype, buffer=self.shm.buf, offset=HEADER.itemsize)
+        # Field views, so every access below is a plain array index
+        self.sequences = slots_array["sequence"]
+        self.timestamps = slots_array["timestamp"]
+        self.detected = slots_array["detected"]
+        self.landmarks = slots_array["landmarks"]
+        self.images = slots_array["image"]
+        if self.owner:
+            self.header["latest"] = 0
+            self.sequences[:] = 0
+
+    @property
+    def spec(self):
+        """Arguments that attach another FrameBus, e.g. in a child process, to this one."""
+        return {"width": self.width, "height": self.height, "slots": len(self.sequences), "name": self.shm.name}
+
+    @property
+    def latest_sequence(self):
+        """Sequence number of the newest frame, 0 before the first one."""
+        return int(self.header["latest"])
+
+    def publish(self, image, frame):
+        """
+        Writes a frame into the next slot. Only one process may publish.
+
+        Args:
+            image (np.ndarray): BGR image, scaled if it is not the bus size.
+            frame (LandmarkFrame): Its landmarks.
+
+        Returns:
+            int: The frame's sequence number.
+        """
+        sequence = self.latest_sequence + 1
+        index = sequence % len(self.sequences)
+        self.sequences[index] = 0
+        if image.shape[:2] == (self.height, self.width):
+            np.copyto(self.images[index], image)
+        else:
+            cv2.resize(image, (self.width, self.height), dst=self.images[index], interpolation=cv2.INTER_AREA)
+        self.landmarks[index] = frame.data
+        self.detected[index] = frame.detected
+        self.timestamps[index] = frame.timestamp
+        self.sequences[index] = sequence
+        self.header["latest"] = sequence
+        return sequence
+
+    def latest(self):
+        """The newest complete frame as a BusFrame, or None before the first one."""
+        while True:
+            sequence = self.latest_sequence
+            if not sequence:
+                return None
+            index = sequence % len(self.sequences)
+            frame = BusFrame(self, index, sequence)
+            # Checked after copying, the writer may have started on the slot meanwhile
+            if frame.valid():
+                return frame
+            # The writer lapped this slot while we copied it; the next newest will do
+
+    def wait(self, after=0, timeout=None):
+        """
+        Waits for a frame newer than sequence number ``after``.
+
+        Returns:
+            BusFrame: The newest frame, or None if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.latest_sequence <= after:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+        return self.latest()
+
+    def close(self):
+        """Detach from the bus; the creating process also frees the shared memory."""
+        if self.shm is None:
+            return
+        self.header = self.sequences = self.timestamps = self.detected = self.landmarks = self.images = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # BusFrames still held elsewhere keep the mapping alive until they are dropped
+            pass
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
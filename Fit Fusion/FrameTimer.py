@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FrameTimer:
+    """
+    Rolling per-stage latency statistics for the pose pipeline.
+
+    Each stage keeps its last ``window`` durations, so the percentiles follow the
+    current behaviour rather than the whole session. All times come from
+    time.monotonic() and are reported in milliseconds.
+    """
+
+    # "idle" is the presence check run instead of "color" and "pose" while nobody is in view
+    STAGES = ("capture", "flip", "color", "pose", "idle", "angles", "draw", "display", "latency")
+
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        self.frame_ends = deque(maxlen=window)
+        self.frames = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._overlay = []
+
+    @staticmethod
+    def now():
+        return time.monotonic()
+
+    def add(self, stage, seconds):
+        """Record one duration for a stage."""
+        with self._lock:
+            self.samples[stage].append(seconds * 1000.0)
+
+    def since(self, stage, start):
+        """Record the time elapsed since ``start`` for a stage and return the current time."""
+        end = time.monotonic()
+        self.add(stage, end - start)
+        return end
+
+    def frame_done(self, captured_at):
+        """Mark a frame as shown, recording its capture-to-display latency."""
+        end = self.since("latency", captured_at)
+        with self._lock:
+            self.frame_ends.append(end)
+            self.frames += 1
+
+    def fps(self):
+        """Frames completed per second over the rolling window."""
+        with self._lock:
+            if len(self.frame_ends) < 2:
+                return 0.0
+            return (len(self.frame_ends) - 1) / (self.frame_ends[-1] - self.frame_ends[0])
+
+    def percentiles(self, stage):
+        """
+        Returns the (p50, p95, p99) duration of a stage in milliseconds, or None if it has no samples.
+        """
+        with self._lock:
+            samples = np.array(self.samples[stage])
+        if not len(samples):
+            return None
+        return tuple(np.percentile(samples, (50, 95, 99)))
+
+    def report(self):
+        """Machine-readable snapshot of every stage, the frame count, FPS and dropped frames."""
+        stages = {}
+        for stage in self.STAGES:
+            values = self.percentiles(stage)
+            if values is not None:
+                stages[stage] = {"p50": values[0], "p95": values[1], "p99": values[2],
+                                 "samples": len(self.samples[stage])}
+        return {"frames": self.frames, "dropped": self.dropped, "fps": self.fps(), "stages_ms": stages}
+
+    def dump(self, path):
+        """Write report() to a JSON file."""
+        with open(path, "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
+
+    def draw(self, image, refresh_every=15):
+        """
+        Draws the stage percentiles in the bottom-left corner of the image.
+
+        The text is recomputed every ``refresh_every`` frames to keep the overlay cheap.
+        """
+        if self.frames % refresh_every == 0 or not self._overlay:
+            self._overlay = [f"FPS {self.fps():.1f}  dropped {self.dropped}"]
+            for stage in self.STAGES:
+                values = self.percentiles(stage)
+                if values is not None:
+                    self._overlay.append(f"{stage:<8} p50 {values[0]:5.1f}  p95 {values[1]:5.1f}  "
+                                         f"p99 {values[2]:5.1f} ms")
+
+        y = image.shape[0] - 10 - 18 * (len(self._overlay) - 1)
+        for line in self._overlay:
+            cv2.putText(image, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1, cv2.LINE_AA)
+            y += 18
@@ -5,7 +5,7 @@ import sqlite3
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QStackedWidget, \
     QTabWidget, QSizePolicy, QHBoxLayout, QMessageBox, QTextEdit, QSlider, QComboBox, QDialog, QProgressBar, \
     QScrollArea, QGridLayout, QAction
-from PyQt5.QtCore import Qt, QTimer, QSize
+from PyQt5.QtCore import Qt, QTimer, QSize, QThread, pyqtSignal
 from PyQt5.QtGui import QPixmap, QBrush, QPalette, QIcon, QImage
 import speech_recognition as sr  # Added for voice recognition
 import threading
@@ -35,6 +35,9 @@ from Database import (login_database as supabase_login, signup_database as supab
 , reset_streak as supabase_streakReset, set_bmi_database as supabase_bmi, supabase)
 
 from PoseTracker import *
+from api import FramePresenter
+from PoseOverlay import OverlayRenderer
+from PoseWorker import shared_worker
 
 class BMI:
     def __init__(self):
@@ -176,6 +179,114 @@ class WorkoutPlanner:
             details += f"Allocated Time: {time_per_exercise:.2f} seconds<br><br>"
         return details
 
+
+class PoseTrackerThread(QThread):
+    """
+    Follows the frames of the shared PoseWorker and streams annotated frames to the GUI.
+
+    Capture and pose inference run in the worker process, which is started after login,
+    so this thread only advances the exercise tracker from the landmarks on the
+    FrameBus and draws the overlay. Frames are only annotated and sent while the GUI
+    has shown the previous one (see frame_shown), so a busy GUI drops frames instead of
+    queuing them up. When the worker process dies, restart_requested asks the GUI
+    thread to start it again, up to MAX_RESTARTS times per session, and status_changed
+    tells the user about it.
+    """
+    frame_ready = pyqtSignal(QImage)
+    feedback_changed = pyqtSignal(str)
+    status_changed = pyqtSignal(str)
+    restart_requested = pyqtSignal()
+
+    MAX_RESTARTS = 3
+
+    # Exercise combo box entries to EXERCISES keys
+    EXERCISE_KEYS = {"Biceps Curl": "biceps_curl", "Squat": "squat", "Push Up": "pushups", "Plank": "plank"}
+
+    def __init__(self, exercise, parent=None):
+        super().__init__(parent)
+        self.tracker = ExerciseDetector(self.EXERCISE_KEYS[exercise])
+        self.dropped = 0
+        self._stopping = threading.Event()
+        self._gui_ready = threading.Event()
+        self._gui_ready.set()
+        self._feedback = None
+        self.presenter = FramePresenter((640, 480))
+        self.overlay = OverlayRenderer()
+
+    def run(self):
+        worker = shared_worker()
+        restarts = 0
+        try:
+            while not self._stopping.is_set():
+                worker.resume()
+                self._follow(worker)
+                if self._stopping.is_set():
+                    break
+                if not worker.failed:
+                    # The source failed or ended, the worker has released it
+                    self.status_changed.emit("The camera stopped delivering frames.")
+                    break
+                restarts += 1
+                if restarts > self.MAX_RESTARTS:
+                    self.status_changed.emit(f"Pose tracking stopped: the pose worker crashed "
+                                             f"(exit code {worker.process.exitcode}).")
+                    break
+                self.status_changed.emit(f"The pose worker crashed (exit code {worker.process.exitcode}), "
+                                         f"restarting it...")
+                # Processes are started from the GUI thread only, see PoseWorker.start()
+                self.restart_requested.emit()
+                while worker.failed and not self._stopping.wait(0.1):
+                    pass
+        finally:
+            worker.pause()
+
+    def _follow(self, worker):
+        """Publish the worker's frames until it stops or this thread is stopped."""
+        bus = worker.bus
+        # Frames from an earlier session may still be on the bus
+        sequence = bus.latest_sequence
+        while not self._stopping.is_set():
+            frame = bus.wait(sequence, timeout=0.5)
+            if frame is None:
+                if not worker.active:
+                    return
+                continue
+            sequence = frame.sequence
+            self._publish(frame)
+
+    def _publish(self, frame):
+        # The landmarks were copied out of the shared memory by FrameBus.latest()
+        self.tracker.update(frame)
+        feedback = " | ".join(line.format(**self.tracker.overlay_values()) for line in self.tracker.definition["lines"])
+        if feedback != self._feedback:
+            self._feedback = feedback
+            self.feedback_changed.emit(feedback)
+
+        if not self._gui_ready.is_set():
+            self.dropped += 1
+            return
+        # Scaled out of the bus into the presenter's buffer and annotated there
+        image = self.presenter.scale(frame.image)
+        if not frame.valid():
+            # The worker overwrote the slot while it was copied
+            self.dropped += 1
+            return
+        self._gui_ready.clear()
+        landmarks = frame.data if frame.detected else None
+        self.tracker.draw(image, landmarks)
+        self.overlay.skeleton(image, landmarks, *self.tracker.drawing_specs)
+        self.frame_ready.emit(self.presenter.wrap(image))
+
+    def frame_shown(self):
+        """Call from the GUI once the last frame has been painted."""
+        self._gui_ready.set()
+
+    def stop(self):
+        """Stop following the worker, which pauses and releases the camera device, and wait for the thread to end."""
+        self._stopping.set()
+        self.wait()
+
+
 class LoginSignupApp(QWidget):
     def __init__(self, api_key,gemini_api_key):
         super().__init__()
@@ -190,6 +301,7 @@ class LoginSignupApp(QWidget):
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone(sample_rate=16000, chunk_size=1024)
         self.voice_assistant_active = False
+        self.pose_thread = None  # PoseTrackerThread of the Pose Tracker tab
         # Pre-adjust ambient noise once during initialization
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source)
@@ -1070,6 +1182,7 @@ class LoginSignupApp(QWidget):
 
     def show_welcome_frame(self, user_name):
         """Show welcome message and initialize tabs after successful login"""
+        shared_worker().start()  # Load the pose model now so the Pose Tracker starts instantly
         self.central_widget.setCurrentIndex(5)  # Switch to a new index for tabs
         self.init_tabs(user_name)  # Initialize tabs
         self.add_to_history(5)  # Add tabs UI to history
@@ -1254,64 +1367,64 @@ class LoginSignupApp(QWidget):
         """)
         layout.addWidget(self.pose_feedback)
 
+        # Live feedback of the running tracker, replaced rather than appended on every change
+        self.pose_status_label = QLabel(self)
+        self.pose_status_label.setAlignment(Qt.AlignCenter)
+        self.pose_status_label.setStyleSheet("""
+            font-size: 16px;
+            font-weight: bold;
+            color: #0057B7;
+            background-color: #E0FFFF;
+            padding: 5px;
+            border-radius: 5px;
+        """)
+        layout.addWidget(self.pose_status_label)
+
         # Video Feed Label
-     #   self.video_feed_label = QLabel(self)
-      #  self.video_feed_label.setFixedSize(640, 480)  # Set size for the video feed
-       # layout.addWidget(self.video_feed_label)
+        self.video_feed_label = QLabel(self)
+        self.video_feed_label.setFixedSize(640, 480)  # Set size for the video feed
+        self.video_feed_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.video_feed_label, alignment=Qt.AlignCenter)
 
         # Add tab
         self.tabs.addTab(pose_tab, "Pose Tracker")
 
     def start_pose_tracking(self):
         selected_exercise = self.exercise_combo.currentText()
+        self.stop_pose_tracking()
         self.pose_feedback.append(f"Starting {selected_exercise} analysis...")
 
-        # Start the pose tracking in a separate thread
-        self.pose_thread = threading.Thread(target=self.run_pose_tracker, args=(selected_exercise,))
+        # Restarts the worker process if it died meanwhile
+        shared_worker().start()
+        # Analyze on a worker thread; frames and feedback come back through signals
+        self.pose_thread = PoseTrackerThread(selected_exercise, self)
+        self.pose_thread.frame_ready.connect(self.show_pose_frame)
+        self.pose_thread.feedback_changed.connect(self.pose_status_label.setText)
+        self.pose_thread.status_changed.connect(self.pose_feedback.append)
+        self.pose_thread.restart_requested.connect(self.restart_pose_worker)
         self.pose_thread.start()
 
-    def run_pose_tracker(self, exercise):
-        # Initialize the posture analyzer
-        posture_analyzer = PostureAnalyzer()
-
-        # Start the video capture
-        posture_analyzer.cap = cv2.VideoCapture(0)
-
-        while True:
-            ret, frame = posture_analyzer.cap.read()
-            if not ret:
-                break
-
-            # Process the frame with the posture analyzer
-            # Here you can call the specific analysis method based on the selected exercise
-            if exercise == "Biceps Curl":
-                posture_analyzer.analyze_biceps_curl()
-            elif exercise == "Squat":
-                posture_analyzer.analyze_squat()
-            elif exercise == "Push Up":
-                posture_analyzer.analyze_pushups()
-            elif exercise == "Plank":
-                posture_analyzer.analyze_plank()
-
-            '''# Convert the frame to RGB format for displaying in QLabel
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            q_img = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
-            # Update the QLabel with the new frame
-            self.video_feed_label.setPixmap(QPixmap.fromImage(q_img))
-            '''
-            # Allow the GUI to process events
-            QApplication.processEvents()
-
-        posture_analyzer.cap.release()
-
-
-
+    def restart_pose_worker(self):
+        """Start the shared pose worker again after its process died; runs on the GUI thread."""
+        shared_worker().start()
 
+    def show_pose_frame(self, q_img):
+        """Show an annotated frame from the pose tracker thread in the video feed label."""
+        self.video_feed_label.setPixmap(QPixmap.fromImage(q_img))
+        if self.pose_thread is not None:
+            self.pose_thread.frame_shown()
 
+    def stop_pose_tracking(self):
+        """Stop a running pose tracker thread and release its camera."""
+        if self.pose_thread is not None:
+            self.pose_thread.stop()
+            self.pose_thread = None
+            self.pose_status_label.clear()
 
+    def closeEvent(self, event):
+        self.stop_pose_tracking()
+        shared_worker().close()
+        super().closeEvent(event)
 
     def create_workout_planner_tab(self):
         workout_tab = QWidget()
@@ -2479,6 +2592,8 @@ class LoginSignupApp(QWidget):
     def logout(self):
         """Handle the logout process."""
         self.current_user_id = None  # Clear the current user ID
+        self.stop_pose_tracking()
+        shared_worker().close()  # Started again by the next login
         self.login_feedback.setText("You have been logged out.")  # Optional feedback
         self.central_widget.setCurrentIndex(0)  # Go back to the main UI (login/signup)
         self.add_to_history(0)  # Add main UI to history
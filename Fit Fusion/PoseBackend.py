@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+import urllib.request
+
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+# Backends PostureAnalyzer can run: the legacy solutions graph, which blocks in process(),
+# and the Tasks PoseLandmarker, which runs asynchronously on live sources (LIVE_STREAM mode)
+# and synchronously on recorded ones (VIDEO mode).
+BACKENDS = ("solutions", "tasks")
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/pose_landmarker/"
+             "pose_landmarker_{variant}/float16/latest/pose_landmarker_{variant}.task")
+
+# Tasks model variants for the legacy model_complexity values
+MODEL_VARIANTS = {0: "lite", 1: "full", 2: "heavy"}
+
+
+def model_path(variant):
+    """
+    Path of a pose_landmarker_<variant>.task model, downloading it into MODELS_DIR the
+    first time it is needed.
+
+    Args:
+        variant (str): "lite", "full" or "heavy".
+    """
+    path = os.path.join(MODELS_DIR, f"pose_landmarker_{variant}.task")
+    if not os.path.exists(path):
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        print(f"Downloading the {variant} pose landmarker model...")
+        urllib.request.urlretrieve(MODEL_URL.format(variant=variant), path + ".part")
+        os.replace(path + ".part", path)
+    return path
+
+
+class LandmarkerResults:
+    """
+    ``pose.process``-style results holding one NormalizedLandmarkList, or None.
+
+    ``timestamp`` is the time.monotonic() second of the frame the landmarks were
+    inferred on, when that is not the frame just passed to process().
+    """
+
+    __slots__ = ("pose_landmarks", "timestamp")
+
+    def __init__(self, pose_landmarks=None, timestamp=None):
+        self.pose_landmarks = pose_landmarks
+        self.timestamp = timestamp
+
+
+def _landmark_list(result):
+    """The first pose of a PoseLandmarkerResult as a NormalizedLandmarkList, or None."""
+    if not result.pose_landmarks:
+        return None
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility)
+        for lm in result.pose_landmarks[0]])
+
+
+def _landmarker(running_mode, model_complexity, model_asset_path, min_detection_confidence,
+                min_tracking_confidence, **options):
+    vision = mp.tasks.vision
+    return vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(
+            model_asset_path=model_asset_path or model_path(MODEL_VARIANTS[model_complexity])),
+        running_mode=running_mode,
+        min_pose_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence,
+        **options,
+    ))
+
+
+class LiveStreamPose:
+    """
+    Tasks PoseLandmarker in LIVE_STREAM mode behind the ``mp.solutions.pose.Pose`` interface.
+
+    process() only hands the frame to MediaPipe and returns at once with the newest
+    result that has arrived, usually that of the previous frame, so the capture loop
+    never waits for the graph. The results carry the timestamp of the frame they belong
+    to, and the same results are returned again until a newer one arrives. Frames sent
+    while the graph is busy are dropped by MediaPipe itself; ``completed`` counts the
+    frames actually inferred. Use VideoPose for recorded sources.
+    """
+
+    def __init__(self, model_complexity=1, model_asset_path=None, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        """
+        Args:
+            model_complexity (int): 0, 1 or 2 for the lite, full or heavy model.
+            model_asset_path (str, optional): A .task model file to use instead.
+            min_detection_confidence (float): Minimum pose detection score.
+            min_tracking_confidence (float): Minimum score to keep tracking the pose.
+        """
+        self._landmarker = _landmarker(mp.tasks.vision.RunningMode.LIVE_STREAM, model_complexity, model_asset_path,
+                                       min_detection_confidence, min_tracking_confidence,
+                                       result_callback=self._on_result)
+        self._lock = threading.Lock()
+        self._results = LandmarkerResults()
+        self._last_timestamp = -1
+        self.submitted = 0
+        self.completed = 0
+
+    def _on_result(self, result, image, timestamp_ms):
+        # Runs on a MediaPipe thread
+        results = LandmarkerResults(_landmark_list(result), timestamp_ms / 1000.0)
+        with self._lock:
+            self._results = results
+            self.completed += 1
+
+    def process(self, image):
+        """
+        Submits an RGB frame and returns the newest available results.
+
+        Args:
+            image (np.ndarray): RGB frame; MediaPipe copies it, so the buffer can be reused.
+        """
+        # LIVE_STREAM timestamps must strictly increase
+        timestamp = max(int(time.monotonic() * 1000), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        self._landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=image), timestamp)
+        self.submitted += 1
+        with self._lock:
+            return self._results
+
+    def reset(self):
+        with self._lock:
+            self._results = LandmarkerResults()
+
+    def close(self):
+        self._landmarker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class VideoPose:
+    """
+    Tasks PoseLandmarker in VIDEO mode behind the ``mp.solutions.pose.Pose`` interface.
+
+    For recorded sources: process() blocks until the frame is inferred and returns that
+    frame's own landmarks, so none are skipped, repeated or paired with a later frame.
+    """
+
+    def __init__(self, model_complexity=1, model_asset_path=None, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, fps=30.0):
+        """
+        Args:
+            model_complexity (int): 0, 1 or 2 for the lite, full or heavy model.
+            model_asset_path (str, optional): A .task model file to use instead.
+            min_detection_confidence (float): Minimum pose detection score.
+            min_tracking_confidence (float): Minimum score to keep tracking the pose.
+            fps (float): Frame rate of the source, which spaces the timestamps MediaPipe
+                tracks with.
+        """
+        self._options = (model_complexity, model_asset_path, min_detection_confidence, min_tracking_confidence)
+        self._landmarker = self._build()
+        self.frame_interval_ms = 1000.0 / fps
+        self._frames = 0
+        self.submitted = 0
+        self.completed = 0
+
+    def _build(self):
+        return _landmarker(mp.tasks.vision.RunningMode.VIDEO, *self._options)
+
+    def process(self, image):
+        """
+        Infers an RGB frame, the next one of the video.
+
+        Args:
+            image (np.ndarray): RGB frame.
+        """
+        timestamp = round(self._frames * self.frame_interval_ms)
+        self._frames += 1
+        self.submitted += 1
+        result = self._landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=image), timestamp)
+        self.completed += 1
+        return LandmarkerResults(_landmark_list(result))
+
+    def reset(self):
+        """Forget the tracking state, e.g. before the next video; VIDEO mode needs a new landmarker for that."""
+        self._landmarker.close()
+        self._landmarker = self._build()
+        self._frames = 0
+
+    def close(self):
+        self._landmarker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_pose_model(model_complexity=1, backend="solutions", offline=False, **options):
+    """
+    Builds a pose graph for one of the BACKENDS.
+
+    Every kind provides ``process(rgb_image)`` returning results with ``pose_landmarks``,
+    ``reset()`` and ``close()``.
+
+    Args:
+        model_complexity (int): 0, 1 or 2, the lite, full or heavy model.
+        backend (str): "solutions" or "tasks".
+        offline (bool): The frames come from a recording rather than a live camera; the
+            tasks backend then infers every frame synchronously, see VideoPose.
+        **options: Passed on, e.g. min_detection_confidence.
+    """
+    options = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5, **options}
+    if backend == "tasks":
+        return (VideoPose if offline else LiveStreamPose)(model_complexity, **options)
+    if backend != "solutions":
+        raise ValueError(f"Unknown pose backend {backend!r}, expected one of {BACKENDS}.")
+    return mp.solutions.pose.Pose(model_complexity=model_complexity, **options)
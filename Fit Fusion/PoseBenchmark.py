@@ -0,0 +1,429 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from PoseBackend import BACKENDS
+from PoseTrace import TraceRecorder, replay
+from PoseTracker import (PostureAnalyzer, ExerciseDetector, ExerciseEngine, LandmarkFrame, EXERCISES, JOINT_ANGLES,
+                         NUM_LANDMARKS, LEFT_HIP, LEFT_KNEE, calculate_angle, calculate_angles, pose)
+
+# Fixture labels file format, one entry per video (or PoseTrace recording):
+#
+#   [{"path": "squats_5.mp4", "exercise": "squat", "reps": {"squats": 5}},
+#    {"path": "plank_20s.mp4", "exercise": "plank", "hold_time": 20.0}]
+#
+# Relative paths are resolved against the labels file's directory. Without a labels file,
+# synthetic_fixtures() traces are replayed instead.
+
+# A standing figure facing the camera, in normalized image coordinates
+_STANDING = {
+    pose.PoseLandmark.NOSE: (0.50, 0.15),
+    pose.PoseLandmark.LEFT_SHOULDER: (0.58, 0.30), pose.PoseLandmark.RIGHT_SHOULDER: (0.42, 0.30),
+    pose.PoseLandmark.LEFT_ELBOW: (0.60, 0.42), pose.PoseLandmark.RIGHT_ELBOW: (0.40, 0.42),
+    pose.PoseLandmark.LEFT_WRIST: (0.61, 0.54), pose.PoseLandmark.RIGHT_WRIST: (0.39, 0.54),
+    pose.PoseLandmark.LEFT_HIP: (0.55, 0.55), pose.PoseLandmark.RIGHT_HIP: (0.45, 0.55),
+    pose.PoseLandmark.LEFT_KNEE: (0.55, 0.72), pose.PoseLandmark.RIGHT_KNEE: (0.45, 0.72),
+    pose.PoseLandmark.LEFT_ANKLE: (0.55, 0.90), pose.PoseLandmark.RIGHT_ANKLE: (0.45, 0.90),
+}
+
+# How each exercise is animated: the joints it moves and the (open, closed) range of the
+# motion. Angles are in degrees; the pushups value is how far the shoulders drop below the hips.
+_MOTIONS = {
+    "biceps_curl": {"joints": ("left_elbow", "right_elbow"), "range": (170.0, 20.0)},
+    "squat": {"joints": ("left_knee",), "range": (175.0, 80.0)},
+    "pushups": {"drop": (0.05, 0.40)},
+    "plank": {"joints": ("left_body_line",), "range": (170.0, 170.0), "lying": True},
+}
+
+def _place(frame, vertex, anchor, moving, degrees):
+    """Moves ``moving`` around ``vertex`` so the angle anchor-vertex-moving equals ``degrees``."""
+    arm = frame[anchor, :2] - frame[vertex, :2]
+    length = np.linalg.norm(frame[moving, :2] - frame[vertex, :2])
+    radians = np.radians(degrees)
+    rotation = np.array([[np.cos(radians), -np.sin(radians)], [np.sin(radians), np.cos(radians)]])
+    frame[moving, :2] = frame[vertex, :2] + rotation @ arm / np.linalg.norm(arm) * length
+
+
+def synthetic_stream(exercise, reps=10, frames_per_rep=30, fps=30.0, noise=0.002, seed=0):
+    """
+    Generates landmarks of a figure doing an exercise, with a known number of reps.
+
+    Args:
+        exercise (str): EXERCISES key.
+        reps (int): Repetitions to perform; for the plank, seconds of hold are
+            ``reps * frames_per_rep / fps``.
+        frames_per_rep (int): Frames per repetition.
+        fps (float): Frame rate of the generated timestamps.
+        noise (float): Standard deviation of the jitter added to x and y.
+        seed (int): Seed of the jitter, so every run gets the same stream.
+
+    Returns:
+        tuple: (frames, 33, 4) float32 landmarks and (frames,) float64 timestamps.
+    """
+    motion = _MOTIONS[exercise]
+    count = reps * frames_per_rep + 1
+    # Every rep goes open -> closed -> open, following a cosine
+    phase = (1 - np.cos(np.linspace(0, 2 * np.pi * reps, count))) / 2
+
+    base = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    base[:, 3] = 1.0
+    for landmark, xy in _STANDING.items():
+        base[landmark, :2] = xy
+    if motion.get("lying"):
+        # Turn the figure a quarter around the image center, head to the left
+        base[:, :2] = np.stack([base[:, 1], 1.0 - base[:, 0]], axis=1)
+
+    landmarks = np.repeat(base[np.newaxis], count, axis=0)
+    for i, amount in enumerate(phase):
+        frame = landmarks[i]
+        if "drop" in motion:
+            opened, closed = motion["drop"]
+            hip_y = frame[[pose.PoseLandmark.LEFT_HIP, pose.PoseLandmark.RIGHT_HIP], 1].mean()
+            frame[[pose.PoseLandmark.LEFT_SHOULDER, pose.PoseLandmark.RIGHT_SHOULDER], 1] = \
+                hip_y + opened + (closed - opened) * amount
+            continue
+        opened, closed = motion["range"]
+        for joint in motion["joints"]:
+            anchor, vertex, moving = JOINT_ANGLES[joint]
+            _place(frame, vertex, anchor, moving, opened + (closed - opened) * amount)
+
+    rng = np.random.default_rng(seed)
+    landmarks[..., :2] += rng.normal(0, noise, landmarks[..., :2].shape).astype(np.float32)
+    timestamps = np.arange(count) / fps
+    return landmarks, timestamps
+
+
+def _per_call(function, repeats):
+    """Best-of-three average seconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeats)
+    return best
+
+
+def bench_angles(repeats=2000):
+    """Per-call cost of calculate_angle and per-frame cost of the vectorized calculate_angles."""
+    landmarks, _ = synthetic_stream("squat", reps=1)
+    frame = landmarks[0]
+    hip, knee, ankle = frame[[LEFT_HIP, LEFT_KNEE, pose.PoseLandmark.LEFT_ANKLE], :2]
+    batch = calculate_angles(landmarks)
+    return {
+        "calculate_angle_us": _per_call(lambda: calculate_angle(hip, knee, ankle), repeats) * 1e6,
+        "calculate_angles_frame_us": _per_call(lambda: calculate_angles(frame), repeats) * 1e6,
+        "calculate_angles_batch_us_per_frame":
+            _per_call(lambda: calculate_angles(landmarks), repeats // 10) * 1e6 / len(batch),
+    }
+
+
+def _feed(tracker, landmarks, timestamps):
+    frame = LandmarkFrame()
+    frame.detected = True
+    for data, timestamp in zip(landmarks, timestamps):
+        frame.data[:] = data
+        frame.timestamp = timestamp
+        tracker.update(frame)
+    return tracker
+
+
+def _synthetic_label(exercise, reps, timestamps):
+    """The label of a synthetic_stream(): every counter does ``reps``, holds last the whole stream."""
+    label = {"exercise": exercise, "reps": {counter: reps for counter in EXERCISES[exercise].get("reps", {})}}
+    if "hold" in EXERCISES[exercise]:
+        label["hold_time"] = float(timestamps[-1] - timestamps[0])
+    return label
+
+
+def synthetic_fixtures(directory, reps=5, idle_seconds=1.0, fps=30.0):
+    """
+    Writes a PoseTrace recording and a labels file for every exercise's synthetic stream.
+
+    Each trace starts with ``idle_seconds`` of nobody in view, so the end-to-end
+    fixtures also cover losing and finding the person, the trace format and replay.
+
+    Returns:
+        str: Path of the labels file.
+    """
+    labels = []
+    for exercise in EXERCISES:
+        landmarks, timestamps = synthetic_stream(exercise, reps, fps=fps, noise=0.004, seed=1)
+        path = os.path.join(directory, f"synthetic_{exercise}.trace")
+        frame = LandmarkFrame()
+        with TraceRecorder(path) as recorder:
+            for timestamp in np.arange(round(idle_seconds * fps)) / fps:
+                frame.timestamp = timestamp
+                recorder.record(frame)
+            frame.detected = True
+            for data, timestamp in zip(landmarks, timestamps + idle_seconds):
+                frame.data[:] = data
+                frame.timestamp = timestamp
+                recorder.record(frame)
+        labels.append({"path": os.path.basename(path), **_synthetic_label(exercise, reps, timestamps)})
+
+    labels_path = os.path.join(directory, "labels.json")
+    with open(labels_path, "w") as labels_file:
+        json.dump(labels, labels_file, indent=2)
+    return labels_path
+
+
+def _score(tracker, label):
+    """Compare a tracker's summary with a label's expected reps and hold time."""
+    summary = tracker.summary()
+    if isinstance(tracker, ExerciseEngine):
+        summary = summary[label["exercise"]]
+    result = {"summary": summary}
+    errors = []
+    for counter, expected in label.get("reps", {}).items():
+        errors.append(abs(summary["reps"].get(counter, 0) - expected))
+    if errors:
+        result["rep_error"] = sum(errors)
+        result["reps_correct"] = not any(errors)
+    if "hold_time" in label:
+        result["hold_time_error"] = abs(summary.get("best_hold_time", 0.0) - label["hold_time"])
+    return result
+
+
+def _score_guess(engine, label):
+    """The engine's exercise guess and whether it matches the label."""
+    guess = engine.guess_exercise()
+    return {"engine_guess": guess, "engine_correct": guess == label["exercise"]}
+
+
+def bench_detectors(reps=10, frames_per_rep=30):
+    """Per-frame update cost and accuracy of every detector on its synthetic stream."""
+    results = {}
+    for exercise in EXERCISES:
+        landmarks, timestamps = synthetic_stream(exercise, reps, frames_per_rep)
+        label = _synthetic_label(exercise, reps, timestamps)
+
+        start = time.perf_counter()
+        tracker = _feed(ExerciseDetector(exercise), landmarks, timestamps)
+        seconds = time.perf_counter() - start
+        result = {"frames": len(landmarks), "update_us": seconds / len(landmarks) * 1e6}
+        result.update(_score(tracker, label))
+
+        # The engine watches every exercise at once and has to pick the right one
+        start = time.perf_counter()
+        engine = _feed(ExerciseEngine(), landmarks, timestamps)
+        result["engine_update_us"] = (time.perf_counter() - start) / len(landmarks) * 1e6
+        result.update(_score_guess(engine, label))
+        results[exercise] = result
+    return results
+
+
+def load_labels(path):
+    """Read a fixture labels file, resolving the fixture paths."""
+    with open(path) as labels_file:
+        labels = json.load(labels_file)
+    root = os.path.dirname(os.path.abspath(path))
+    for label in labels:
+        label["path"] = os.path.join(root, label["path"])
+    return labels
+
+
+def bench_fixture(label, backend="solutions", **options):
+    """
+    End-to-end FPS, per-stage latency and accuracy on one labeled video or trace.
+
+    Args:
+        label (dict): One entry of the labels file.
+        backend (str): PostureAnalyzer backend for videos, "solutions" or "tasks".
+        **options: PostureAnalyzer.run() options, e.g. adaptive=True.
+    """
+    tracker = ExerciseDetector(label["exercise"])
+    if label["path"].endswith(".trace"):
+        start = time.perf_counter()
+        frames = replay(label["path"], tracker)
+        seconds = time.perf_counter() - start
+        result = {"frames": frames, "fps": frames / seconds if seconds else 0.0}
+        # Replays are cheap, so also check that the engine recognizes the exercise
+        engine = ExerciseEngine()
+        replay(label["path"], engine)
+        result.update(_score_guess(engine, label))
+    else:
+        cap = cv2.VideoCapture(label["path"])
+        if not cap.isOpened():
+            return {"error": "Could not open video."}
+        # Offline, so the tasks backend infers every frame instead of the newest one
+        analyzer = PostureAnalyzer(backend=backend, offline=True)
+        analyzer.cap = cap
+        start = time.perf_counter()
+        # Timed with the video's clock, so hold times do not depend on the machine's speed
+        analyzer.run(tracker, headless=True, source_clock=True, **options)
+        seconds = time.perf_counter() - start
+        result = analyzer.timer.report()
+        if hasattr(analyzer.pose, "completed"):
+            # Frames the landmarker finished, rather than frames handed to it
+            result["inferred_fps"] = analyzer.pose.completed / seconds if seconds else 0.0
+        analyzer.pose.close()
+    result.update(_score(tracker, label))
+    return result
+
+
+class _PacedVideo:
+    """
+    A video file that delivers its frames no faster than its frame rate, like a camera.
+
+    Wraps a cv2.VideoCapture; everything but read() is passed through.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self.interval = 1.0 / fps if fps > 0 else 1.0 / 30
+        self._due = None
+
+    def read(self, image=None):
+        now = time.perf_counter()
+        if self._due is None:
+            self._due = now
+        elif self._due > now:
+            time.sleep(self._due - now)
+        self._due += self.interval
+        return self.cap.read(image)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+def bench_live(label, **options):
+    """
+    LIVE_STREAM throughput of the tasks backend on one labeled video, played in real time.
+
+    The asynchronous landmarker drops frames that arrive while it is busy, so its
+    throughput only means something when frames come at a camera's pace, not as fast as
+    the file decodes.
+
+    Args:
+        label (dict): One entry of the labels file.
+        **options: PostureAnalyzer.run() options.
+    """
+    cap = cv2.VideoCapture(label["path"])
+    if not cap.isOpened():
+        return {"error": "Could not open video."}
+    tracker = ExerciseDetector(label["exercise"])
+    analyzer = PostureAnalyzer(backend="tasks")
+    analyzer.cap = _PacedVideo(cap)
+    start = time.perf_counter()
+    analyzer.run(tracker, headless=True, **options)
+    seconds = time.perf_counter() - start
+    result = analyzer.timer.report()
+    result["submitted"] = analyzer.pose.submitted
+    result["inferred_fps"] = analyzer.pose.completed / seconds if seconds else 0.0
+    analyzer.pose.close()
+    result.update(_score(tracker, label))
+    return result
+
+
+def run_benchmarks(labels_path=None, backends=("solutions",), **options):
+    """
+    Runs the whole suite.
+
+    Args:
+        labels_path (str, optional): Fixture labels file. Without one, the traces of
+            synthetic_fixtures() are replayed.
+        backends (tuple[str]): Pose backends the video fixtures run on. Results of other
+            backends than "solutions" are reported as "<fixture>@<backend>"; the tasks
+            backend also gets a real-time live stream run, "<fixture>@tasks-live".
+        **options: PostureAnalyzer.run() options for the video fixtures.
+
+    Returns:
+        dict: The machine-readable report.
+    """
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"host": platform.node(), "processor": platform.processor(), "cpus": os.cpu_count(),
+                    "python": platform.python_version(), "opencv": cv2.__version__},
+        "options": options,
+        "backends": list(backends),
+        "angles": bench_angles(),
+        "detectors": bench_detectors(),
+        "fixtures": {},
+    }
+    if labels_path:
+        _bench_fixtures(report, load_labels(labels_path), backends, options)
+    else:
+        with tempfile.TemporaryDirectory(prefix="pose_benchmark_") as directory:
+            _bench_fixtures(report, load_labels(synthetic_fixtures(directory)), backends, options)
+    return report
+
+
+def _bench_fixtures(report, labels, backends, options):
+    for label in labels:
+        name = os.path.basename(label["path"])
+        for backend in backends if not name.endswith(".trace") else ("solutions",):
+            key = name if backend == "solutions" else f"{name}@{backend}"
+            report["fixtures"][key] = bench_fixture(label, backend, **options)
+            if backend == "tasks" and not name.endswith(".trace"):
+                report["fixtures"][f"{name}@tasks-live"] = bench_live(label, **options)
+
+
+def _metrics(report):
+    """Flatten the timing numbers of a report into {name: value}."""
+    metrics = dict(report["angles"])
+    for exercise, result in report["detectors"].items():
+        metrics[f"{exercise}.update_us"] = result["update_us"]
+        metrics[f"{exercise}.engine_update_us"] = result["engine_update_us"]
+    for fixture, result in report["fixtures"].items():
+        if "fps" in result:
+            metrics[f"{fixture}.fps"] = result["fps"]
+        if "inferred_fps" in result:
+            metrics[f"{fixture}.inferred_fps"] = result["inferred_fps"]
+        latency = result.get("stages_ms", {}).get("latency")
+        if latency:
+            metrics[f"{fixture}.latency_p95_ms"] = latency["p95"]
+    return metrics
+
+
+def compare(report, baseline):
+    """
+    Relative change of every timing metric against a baseline report.
+
+    Returns:
+        dict: {metric: (baseline, current, change)}, change as a fraction; for FPS higher
+            is better, for every other metric lower is better.
+    """
+    current, previous = _metrics(report), _metrics(baseline)
+    return {name: (previous[name], value, (value - previous[name]) / previous[name])
+            for name, value in current.items() if previous.get(name)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pose tracker and check its rep-count accuracy.")
+    parser.add_argument("-l", "--labels", default=None, help="Fixture labels JSON file")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Report file to write")
+    parser.add_argument("-c", "--compare", default=None, help="Earlier report to compare against")
+    parser.add_argument("--adaptive", action="store_true", help="Run the fixtures with adaptive cadence")
+    parser.add_argument("--roi", action="store_true", help="Run the fixtures with ROI cropping")
+    parser.add_argument("--pipelined", action="store_true", help="Run the fixtures pipelined")
+    parser.add_argument("-b", "--backends", nargs="+", choices=BACKENDS, default=["solutions"],
+                        help="Pose backends to run the video fixtures on")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.labels, args.backends, adaptive=args.adaptive, roi=args.roi,
+                            pipelined=args.pipelined)
+    with open(args.output, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    for exercise, result in report["detectors"].items():
+        print(f"{exercise:<12} {result['update_us']:7.1f} us/frame  rep error {result.get('rep_error', '-')}  "
+              f"guess {result['engine_guess']}")
+    for fixture, result in report["fixtures"].items():
+        fps = result.get("inferred_fps", result.get("fps", 0.0))
+        print(f"{fixture:<12} {fps:7.1f} fps  rep error {result.get('rep_error', '-')}  "
+              f"guess {result.get('engine_guess', '-')}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            changes = compare(report, json.load(baseline_file))
+        for name, (previous, value, change) in sorted(changes.items()):
+            print(f"{name:<40} {previous:10.2f} -> {value:10.2f}  {change:+.1%}")
@@ -0,0 +1,159 @@
+import cv2
+import numpy as np
+from mediapipe.python.solutions import pose
+
+# Skeleton edges as an (edges, 2) array of landmark indices
+POSE_CONNECTIONS = np.array(sorted(pose.POSE_CONNECTIONS), dtype=np.intp)
+
+# The overlay layout was designed on 640x480 frames; positions and sizes scale with the height
+REFERENCE_HEIGHT = 480
+
+LANDMARK_COLOR = (0, 0, 255)
+CONNECTION_COLOR = (224, 224, 224)
+TEXT_COLOR = (255, 255, 255)
+
+
+def _text_layer(pixels):
+    """
+    Coverage weights of text drawn in TEXT_COLOR on black, for _blend().
+
+    The anti-aliased edge pixels are partly covered, so they keep part of the frame below.
+    """
+    alpha = pixels.max(axis=2).astype(np.float32) / 255
+    return np.full_like(pixels, TEXT_COLOR), alpha, 1 - alpha
+
+
+def _blend(region, layer):
+    """Composites a _text_layer() onto an image region in place."""
+    ink, alpha, inverse = layer
+    region[:] = cv2.blendLinear(ink, region, alpha, inverse)
+
+
+class OverlayRenderer:
+    """
+    Draws the tracker overlay with as few OpenCV calls as possible.
+
+    The skeleton is drawn with one polyline call for the bones and two for the joints.
+    The header panel (banner and text lines) is rendered into a cached layer that is only
+    redrawn when its text or the frame size changes, and short labels are cached as small
+    patches, so each frame mostly composites already rendered pixels.
+    """
+
+    def __init__(self, max_labels=256):
+        self.max_labels = max_labels
+        self._panel_key = None
+        self._panel = None
+        self._panel_layer = None
+        self._labels = {}
+
+    @staticmethod
+    def scale(image):
+        """Size factor of the overlay on this image, 1.0 at 480 lines."""
+        return image.shape[0] / REFERENCE_HEIGHT
+
+    def skeleton(self, image, landmarks, landmark_spec=None, connection_spec=None, min_visibility=0.5):
+        """
+        Draws the pose skeleton.
+
+        Args:
+            image (np.ndarray): BGR image to draw on.
+            landmarks (np.ndarray | None): (33, 4) normalized x, y, z, visibility.
+            landmark_spec, connection_spec (DrawingSpec, optional): Colors and sizes like
+                ``mp_drawing.draw_landmarks`` takes them.
+            min_visibility (float): Landmarks less visible than this are left out.
+        """
+        if landmarks is None:
+            return
+        height, width = image.shape[:2]
+        points = (landmarks[:, :2] * (width, height)).astype(np.int32)
+        visible = landmarks[:, 3] >= min_visibility
+
+        edges = POSE_CONNECTIONS[visible[POSE_CONNECTIONS].all(axis=1)]
+        if len(edges):
+            color = connection_spec.color if connection_spec else CONNECTION_COLOR
+            thickness = connection_spec.thickness if connection_spec else 2
+            cv2.polylines(image, points[edges], False, color, thickness)
+
+        # Zero-length segments with round caps draw filled dots, all in one call
+        dots = np.repeat(points[visible][:, np.newaxis], 2, axis=1)
+        if len(dots):
+            radius = landmark_spec.circle_radius if landmark_spec else 2
+            color = landmark_spec.color if landmark_spec else LANDMARK_COLOR
+            cv2.polylines(image, dots, False, (255, 255, 255), 2 * radius + 3)
+            cv2.polylines(image, dots, False, color, 2 * radius + 1)
+
+    def panel(self, image, lines, banner=None):
+        """
+        Composites the header: an optional full-width banner and the text lines.
+
+        Args:
+            image (np.ndarray): BGR image to draw on.
+            lines (list[str]): Text lines, drawn from the top left.
+            banner (tuple, optional): BGR color of the banner behind the text.
+        """
+        height, width = image.shape[:2]
+        key = (tuple(lines), banner, height, width)
+        if key != self._panel_key:
+            self._panel_key = key
+            self._render_panel(lines, banner, height, width)
+        if self._panel is None:
+            return
+        region = image[:self._panel.shape[0], :self._panel.shape[1]]
+        if self._panel_layer is None:
+            region[:] = self._panel
+        else:
+            _blend(region, self._panel_layer)
+
+    def _render_panel(self, lines, banner, height, width):
+        scale = height / REFERENCE_HEIGHT
+        line_height = int(40 * scale)
+        panel_height = min(height, max(int(100 * scale) if banner else 0, line_height * len(lines) + int(10 * scale)))
+        if panel_height <= 0:
+            self._panel = self._panel_layer = None
+            return
+
+        thickness = max(1, round(2 * scale))
+        if not banner:
+            # Only as wide as the text, the rest of the frame is left alone
+            text_width = max((cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)[0][0]
+                              for line in lines), default=0)
+            width = min(width, int(10 * scale) + text_width + thickness)
+        self._panel = np.zeros((panel_height, width, 3), dtype=np.uint8)
+        if banner:
+            self._panel[:int(100 * scale)] = banner
+        for i, line in enumerate(lines):
+            cv2.putText(self._panel, line, (int(10 * scale), line_height * (i + 1)),
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, TEXT_COLOR, thickness, cv2.LINE_AA)
+        # Without a banner only the text covers the frame, blended at its anti-aliased edges
+        self._panel_layer = None if banner else _text_layer(self._panel)
+
+    def label(self, image, text, position, font_scale=0.5):
+        """
+        Draws a short label, e.g. a joint angle, at a normalized (x, y) position.
+
+        Rendered labels are cached by text, so values that repeat cost only a blend.
+        """
+        height, width = image.shape[:2]
+        scale = height / REFERENCE_HEIGHT
+        key = (text, font_scale, height)
+        patch = self._labels.get(key)
+        if patch is None:
+            if len(self._labels) >= self.max_labels:
+                self._labels.clear()
+            thickness = max(1, round(2 * scale))
+            (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX,
+                                                                  font_scale * scale, thickness)
+            pixels = np.zeros((text_height + baseline + thickness, text_width + thickness, 3), dtype=np.uint8)
+            cv2.putText(pixels, text, (0, text_height), cv2.FONT_HERSHEY_SIMPLEX, font_scale * scale,
+                        TEXT_COLOR, thickness, cv2.LINE_AA)
+            patch = self._labels[key] = (_text_layer(pixels), text_height)
+
+        layer, ascent = patch
+        pixels = layer[0]
+        x, y = int(position[0] * width), int(position[1] * height) - ascent
+        # Clip the patch to the image, like putText clips its text
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + pixels.shape[1], width), min(y + pixels.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        _blend(image[y0:y1, x0:x1], [part[y0 - y:y1 - y, x0 - x:x1 - x] for part in layer])
@@ -0,0 +1,120 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import mediapipe as mp
+import numpy as np
+
+
+class PosePool:
+    """
+    Fixed set of MediaPipe Pose graphs shared between several users.
+
+    A graph keeps tracking state from one frame to the next, so acquire() hands a user
+    back the graph it had last time whenever that graph is free, and resets graphs that
+    change hands.
+    """
+
+    def __init__(self, size=None, **pose_options):
+        """
+        Builds and warms up every graph, see warm_up().
+
+        Args:
+            size (int, optional): Number of graphs. Defaults to the CPU count.
+            **pose_options: Passed to ``mp.solutions.pose.Pose``.
+        """
+        self.size = size or os.cpu_count() or 1
+        self.pose_options = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5, **pose_options}
+        self._cond = threading.Condition()
+        self._free = []
+        self._built = 0
+        self._last_user = {}
+        self.warm_up()
+
+    def _build(self):
+        return mp.solutions.pose.Pose(**self.pose_options)
+
+    def _reserve(self):
+        """Claim the right to build one more graph; call with self._cond held."""
+        if self._built >= self.size:
+            return False
+        self._built += 1
+        return True
+
+    def warm_up(self):
+        """
+        Builds every missing graph and runs a blank frame through it, so neither model
+        loading nor the first inference slows down the first real frame.
+        """
+        blank = np.zeros((256, 256, 3), dtype=np.uint8)
+        while True:
+            with self._cond:
+                if not self._reserve():
+                    return
+            pose_model = self._build()
+            pose_model.process(blank)
+            pose_model.reset()
+            with self._cond:
+                self._free.append(pose_model)
+                self._cond.notify()
+
+    def acquire(self, user=None, timeout=None):
+        """
+        Takes a graph out of the pool, waiting for one to be released if none is free.
+
+        Args:
+            user (hashable, optional): Who the graph is for; their previous graph is preferred.
+            timeout (float, optional): Seconds to wait before giving up.
+
+        Returns:
+            The Pose graph, or None if the timeout expired.
+        """
+        with self._cond:
+            if not self._free and self._reserve():
+                build = True
+            else:
+                build = False
+                if not self._cond.wait_for(lambda: self._free, timeout):
+                    return None
+                pose_model = self._take(user)
+        if build:
+            # Room for another graph, e.g. after close(); build one right away
+            return self._build()
+        if self._last_user.get(id(pose_model), user) != user:
+            # Don't let the previous user's tracking state leak into this session
+            pose_model.reset()
+        return pose_model
+
+    def _take(self, user):
+        for i, pose_model in enumerate(self._free):
+            if self._last_user.get(id(pose_model)) == user:
+                return self._free.pop(i)
+        # Prefer a graph nobody has used yet over taking over someone else's
+        for i, pose_model in enumerate(self._free):
+            if id(pose_model) not in self._last_user:
+                return self._free.pop(i)
+        return self._free.pop(0)
+
+    def release(self, pose_model, user=None):
+        """Return a graph taken with acquire()."""
+        with self._cond:
+            self._last_user[id(pose_model)] = user
+            self._free.append(pose_model)
+            self._cond.notify()
+
+    @contextmanager
+    def borrow(self, user=None):
+        """``with pool.borrow(user) as pose_model:`` acquires and always releases a graph."""
+        pose_model = self.acquire(user)
+        try:
+            yield pose_model
+        finally:
+            self.release(pose_model, user)
+
+    def close(self):
+        """Close the graphs currently in the pool."""
+        with self._cond:
+            for pose_model in self._free:
+                pose_model.close()
+            self._built -= len(self._free)
+            self._free.clear()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+# File layout: a fixed header followed by one fixed-size record per frame, so a trace
+# can be appended to while recording and memory-mapped as a record array when replayed.
+MAGIC = b"FFTRACE1"
+HEADER = struct.Struct("<8sHHIQd")  # magic, landmarks, channels, reserved, frames, start time
+TIME_UNIT = 1e-6  # Timestamps are stored as microsecond deltas from the previous frame
+MAX_DELTA = np.iinfo(np.uint32).max
+
+
+def record_dtype(num_landmarks=33, channels=4):
+    """Per-frame record: timestamp delta, detection flag and float16 x, y, z, visibility."""
+    return np.dtype([("delta", "<u4"), ("detected", "u1"), ("landmarks", "<f2", (num_landmarks, channels))])
+
+
+class TraceFrame:
+    """
+    The landmarks of one replayed frame, with the same attributes as
+    PoseTracker.LandmarkFrame so the exercise detectors accept it.
+    """
+
+    __slots__ = ("data", "detected", "timestamp")
+
+    def __init__(self, num_landmarks=33, channels=4):
+        self.data = np.zeros((num_landmarks, channels), dtype=np.float32)
+        self.detected = False
+        self.timestamp = 0.0
+
+
+class TraceRecorder:
+    """
+    Appends landmark frames to a compact binary trace file.
+
+    Landmarks are stored as float16 (about 3 significant digits, well below MediaPipe's
+    own jitter) and timestamps as microsecond deltas, so a frame takes 269 bytes.
+    """
+
+    def __init__(self, path, num_landmarks=33, channels=4):
+        """
+        Args:
+            path (str): Trace file to create, overwriting any existing one.
+            num_landmarks (int): Landmarks per frame.
+            channels (int): Values per landmark, x, y, z and visibility.
+        """
+        self.path = path
+        self.num_landmarks = num_landmarks
+        self.channels = channels
+        self.frames = 0
+        self.start = None
+        self._last = None
+        self._record = np.zeros(1, dtype=record_dtype(num_landmarks, channels))
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.num_landmarks, self.channels, 0, self.frames,
+                                     self.start or 0.0))
+        self._file.seek(0, 2)
+
+    def record(self, frame):
+        """
+        Appends one frame.
+
+        Args:
+            frame (LandmarkFrame): Landmarks with ``data``, ``detected`` and ``timestamp`` in seconds.
+        """
+        ticks = round(frame.timestamp / TIME_UNIT)
+        if self.start is None:
+            self.start = frame.timestamp
+            self._last = ticks
+            # Store the start time right away; only the frame count waits for close()
+            self._write_header()
+        delta = min(max(ticks - self._last, 0), MAX_DELTA)
+        self._last += delta
+        record = self._record
+        record["delta"] = delta
+        record["detected"] = frame.detected
+        record["landmarks"] = frame.data if frame.detected else 0
+        self._file.write(record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        """Write the final frame count into the header and close the file."""
+        if not self._file.closed:
+            self._write_header()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceReader:
+    """
+    Memory-mapped view of a trace written by TraceRecorder.
+
+    Attributes:
+        records (np.ndarray): The raw per-frame records, see record_dtype().
+        timestamps (np.ndarray): (frames,) float64 frame times in seconds.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as trace_file:
+            magic, num_landmarks, channels, _, frames, start = HEADER.unpack(trace_file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pose trace.")
+
+        self.path = path
+        self.num_landmarks = num_landmarks
+        self.channels = channels
+        dtype = record_dtype(num_landmarks, channels)
+        if not frames:
+            # Never closed, e.g. the recording process crashed: count the complete records
+            frames = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        if frames:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(frames,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        # Summing integer ticks keeps the replayed times identical on every run
+        ticks = np.cumsum(self.records["delta"], dtype=np.int64)
+        self.timestamps = start + (ticks - (ticks[0] if frames else 0)) * TIME_UNIT
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def landmarks(self):
+        """(frames, landmarks, channels) float16 landmark array."""
+        return self.records["landmarks"]
+
+    @property
+    def detected(self):
+        """(frames,) bool array, True where a pose was found."""
+        return self.records["detected"].astype(bool)
+
+    def frames(self, frame=None):
+        """
+        Yields every frame in order, updating one frame object in place.
+
+        Args:
+            frame (optional): Object to fill, e.g. a LandmarkFrame. Defaults to a TraceFrame.
+        """
+        frame = TraceFrame(self.num_landmarks, self.channels) if frame is None else frame
+        for record, timestamp in zip(self.records, self.timestamps):
+            frame.detected = bool(record["detected"])
+            frame.timestamp = float(timestamp)
+            if frame.detected:
+                frame.data[:] = record["landmarks"]
+            yield frame
+
+
+def replay(path, *trackers):
+    """
+    Feeds a recorded trace through exercise trackers, without a camera or pose inference.
+
+    Args:
+        path (str): Trace file written by TraceRecorder.
+        *trackers: ExerciseDetector or ExerciseEngine objects to update.
+
+    Returns:
+        int: Number of frames replayed.
+    """
+    reader = TraceReader(path)
+    for frame in reader.frames():
+        for tracker in trackers:
+            tracker.update(frame)
+    return len(reader)
+
+
+if __name__ == "__main__":
+    from PoseTracker import ExerciseDetector, ExerciseEngine
+
+    parser = argparse.ArgumentParser(description="Replay recorded pose traces through the exercise detectors.")
+    parser.add_argument("traces", nargs="+", help="Trace files recorded with PostureAnalyzer.run(record=...)")
+    parser.add_argument("-e", "--exercise", default=None, help="Exercise to replay; all of them by default")
+    args = parser.parse_args()
+
+    for path in args.traces:
+        tracker = ExerciseDetector(args.exercise) if args.exercise else ExerciseEngine()
+        start = time.monotonic()
+        frames = replay(path, tracker)
+        summary = {"trace": path, "frames": frames, "seconds": time.monotonic() - start,
+                   "summary": tracker.summary()}
+        if isinstance(tracker, ExerciseEngine):
+            summary["exercise"] = tracker.guess_exercise()
+        print(json.dumps(summary))
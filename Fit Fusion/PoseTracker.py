@@ -1,8 +1,28 @@
+import operator
+import threading
+import time
+from collections import deque
+
 import cv2
 import mediapipe as mp
 import numpy as np
 from mediapipe.python.solutions import pose
 
+from CameraManager import open_camera
+from FrameTimer import FrameTimer
+from PoseBackend import LandmarkerResults, create_pose_model
+from PoseOverlay import OverlayRenderer
+from PoseTrace import TraceRecorder
+from PoseTuner import PoseTuner, RESOLUTIONS
+
+NUM_LANDMARKS = len(pose.PoseLandmark)
+
+# Landmark indices resolved once instead of through the PoseLandmark enum on every frame
+LEFT_SHOULDER, RIGHT_SHOULDER = pose.PoseLandmark.LEFT_SHOULDER.value, pose.PoseLandmark.RIGHT_SHOULDER.value
+LEFT_ELBOW, RIGHT_ELBOW = pose.PoseLandmark.LEFT_ELBOW.value, pose.PoseLandmark.RIGHT_ELBOW.value
+LEFT_HIP, RIGHT_HIP = pose.PoseLandmark.LEFT_HIP.value, pose.PoseLandmark.RIGHT_HIP.value
+LEFT_KNEE, RIGHT_KNEE = pose.PoseLandmark.LEFT_KNEE.value, pose.PoseLandmark.RIGHT_KNEE.value
+
 
 def calculate_angle(a, b, c):
     a = np.array(a)
@@ -13,281 +33,1354 @@ def calculate_angle(a, b, c):
     return 360 - angle if angle > 180.0 else angle
 
 
-class PostureAnalyzer:
+# Joint angles computed for every frame, as (first, vertex, last) landmark indices.
+# The angle is measured at the vertex, in the image plane, like calculate_angle.
+JOINT_ANGLES = {
+    "left_elbow": (pose.PoseLandmark.LEFT_SHOULDER, pose.PoseLandmark.LEFT_ELBOW, pose.PoseLandmark.LEFT_WRIST),
+    "right_elbow": (pose.PoseLandmark.RIGHT_SHOULDER, pose.PoseLandmark.RIGHT_ELBOW, pose.PoseLandmark.RIGHT_WRIST),
+    "left_shoulder": (pose.PoseLandmark.LEFT_ELBOW, pose.PoseLandmark.LEFT_SHOULDER, pose.PoseLandmark.LEFT_HIP),
+    "right_shoulder": (pose.PoseLandmark.RIGHT_ELBOW, pose.PoseLandmark.RIGHT_SHOULDER, pose.PoseLandmark.RIGHT_HIP),
+    "left_hip": (pose.PoseLandmark.LEFT_SHOULDER, pose.PoseLandmark.LEFT_HIP, pose.PoseLandmark.LEFT_KNEE),
+    "right_hip": (pose.PoseLandmark.RIGHT_SHOULDER, pose.PoseLandmark.RIGHT_HIP, pose.PoseLandmark.RIGHT_KNEE),
+    "left_knee": (pose.PoseLandmark.LEFT_HIP, pose.PoseLandmark.LEFT_KNEE, pose.PoseLandmark.LEFT_ANKLE),
+    "right_knee": (pose.PoseLandmark.RIGHT_HIP, pose.PoseLandmark.RIGHT_KNEE, pose.PoseLandmark.RIGHT_ANKLE),
+    "left_body_line": (pose.PoseLandmark.LEFT_SHOULDER, pose.PoseLandmark.LEFT_HIP, pose.PoseLandmark.LEFT_ANKLE),
+    "right_body_line": (pose.PoseLandmark.RIGHT_SHOULDER, pose.PoseLandmark.RIGHT_HIP, pose.PoseLandmark.RIGHT_ANKLE),
+}
+
+# Column of each joint in the array returned by calculate_angles
+ANGLE_INDEX = {name: i for i, name in enumerate(JOINT_ANGLES)}
+
+_ANGLE_POINTS = np.array([[int(p) for p in points] for points in JOINT_ANGLES.values()])
+
+
+def calculate_angles(landmarks):
+    """
+    Computes every joint in JOINT_ANGLES in one vectorized pass.
+
+    Args:
+        landmarks (array-like): One frame of landmarks with shape (33, 2+) or a batch
+            of frames with shape (frames, 33, 2+). Only x and y are used.
+
+    Returns:
+        np.ndarray: Angles in degrees with shape (joints,) or (frames, joints),
+            ordered as JOINT_ANGLES. Look columns up with ANGLE_INDEX.
+    """
+    points = np.asarray(landmarks, dtype=np.float32)[..., :2]
+    a = points[..., _ANGLE_POINTS[:, 0], :]
+    b = points[..., _ANGLE_POINTS[:, 1], :]
+    c = points[..., _ANGLE_POINTS[:, 2], :]
+    radians = (np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0])
+               - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]))
+    angles = np.abs(np.degrees(radians))
+    return np.where(angles > 180.0, 360.0 - angles, angles)
+
+
+class LandmarkFrame:
+    """
+    One frame of pose landmarks held in a single preallocated array.
+
+    Attributes:
+        data (np.ndarray): (33, 4) float32 array of x, y, z and visibility, reused every frame.
+        detected (bool): Whether the last update contained a pose.
+        timestamp (float): Monotonic time of the last update, in seconds.
+    """
+
+    __slots__ = ("data", "detected", "timestamp", "_flat")
+
     def __init__(self):
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        self.cap = None
+        self.data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.detected = False
+        self.timestamp = 0.0
+        self._flat = self.data.reshape(-1)
 
-    def start_camera(self):
-        """Initialize the camera for video capture."""
-        self.cap = cv2.VideoCapture(0)
+    def update(self, pose_landmarks, timestamp=None):
+        """
+        Copies MediaPipe landmarks into the array in place.
 
-    def release_camera(self):
-        """Release the camera and close all OpenCV windows."""
-        if self.cap is not None:
-            self.cap.release()
-            cv2.destroyAllWindows()
+        Args:
+            pose_landmarks: ``results.pose_landmarks`` from ``Pose.process``, or None.
+            timestamp (float, optional): Frame time in seconds. Defaults to time.monotonic().
 
-    def analyze_biceps_curl(self):
-        left_counter, right_counter = 0, 0
-        left_stage, right_stage = "down", "down"  # Initialize stages
+        Returns:
+            bool: True if a pose was detected.
+        """
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.detected = pose_landmarks is not None
+        if self.detected:
+            self._flat[:] = [value for lm in pose_landmarks.landmark
+                             for value in (lm.x, lm.y, lm.z, lm.visibility)]
+        return self.detected
 
-        try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Failed to capture video.")
+    @property
+    def xy(self):
+        """(33, 2) view of the normalized image coordinates."""
+        return self.data[:, :2]
+
+    @property
+    def visibility(self):
+        """(33,) view of the landmark visibility scores."""
+        return self.data[:, 3]
+
+    def point(self, index):
+        """Normalized (x, y) view of a single landmark."""
+        return self.data[index, :2]
+
+
+class LandmarkHistory:
+    """
+    Fixed-size ring buffer of recent LandmarkFrame contents.
+
+    Frames are copied into one preallocated (size, 33, 4) array, so pushing never allocates.
+    """
+
+    __slots__ = ("size", "frames", "timestamps", "detected", "count", "_head")
+
+    def __init__(self, size=30):
+        self.size = size
+        self.frames = np.zeros((size, NUM_LANDMARKS, 4), dtype=np.float32)
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.detected = np.zeros(size, dtype=bool)
+        self.count = 0
+        self._head = 0
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def push(self, frame):
+        """Copy a LandmarkFrame into the oldest slot."""
+        slot = self._head
+        self.frames[slot] = frame.data
+        self.timestamps[slot] = frame.timestamp
+        self.detected[slot] = frame.detected
+        self._head = (slot + 1) % self.size
+        self.count += 1
+
+    def latest(self, age=0):
+        """
+        Returns the landmarks pushed ``age`` frames ago (0 is the newest) as a view.
+
+        Raises:
+            IndexError: If the history does not reach that far back.
+        """
+        if age >= len(self):
+            raise IndexError("landmark history is shorter than the requested age")
+        slot = (self._head - 1 - age) % self.size
+        return self.frames[slot]
+
+    def time(self, age=0):
+        """Returns the timestamp of the frame pushed ``age`` frames ago, see latest()."""
+        if age >= len(self):
+            raise IndexError("landmark history is shorter than the requested age")
+        return self.timestamps[(self._head - 1 - age) % self.size]
+
+    def window(self):
+        """Returns (frames, timestamps, detected) in chronological order."""
+        order = (np.arange(len(self)) + self._head - len(self)) % self.size
+        return self.frames[order], self.timestamps[order], self.detected[order]
+
+    def clear(self):
+        """Forget all stored frames."""
+        self.count = 0
+        self._head = 0
+
+
+class LatestFrameQueue:
+    """
+    Bounded queue between pipeline stages where the newest item always wins.
+
+    When the queue is full, putting a new item drops the oldest one instead of blocking,
+    so a slow consumer only ever sees the freshest frame.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Add an item, dropping the oldest one if the queue is full."""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Takes the oldest remaining item.
+
+        Returns:
+            The item, or None if the queue was closed or the timeout expired.
+        """
+        with self._cond:
+            while not self._items and not self._closed:
+                if not self._cond.wait(timeout):
                     break
+            return self._items.popleft() if self._items else None
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def close(self):
+        """Wake up any waiting consumer; get() returns None once the queue is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+def shoulder_hip_drop(landmarks):
+    """How far the shoulders sit below the hips in the image, averaged over both sides."""
+    y = landmarks[..., 1]
+    return (y[..., LEFT_SHOULDER] + y[..., RIGHT_SHOULDER]) / 2 - (y[..., LEFT_HIP] + y[..., RIGHT_HIP]) / 2
+
+
+def torso_incline(landmarks):
+    """Angle of the shoulder-to-hip line against the horizontal, in degrees: 0 lying, 90 upright."""
+    x, y = landmarks[..., 0], landmarks[..., 1]
+    dx = (x[..., LEFT_SHOULDER] + x[..., RIGHT_SHOULDER] - x[..., LEFT_HIP] - x[..., RIGHT_HIP]) / 2
+    dy = (y[..., LEFT_SHOULDER] + y[..., RIGHT_SHOULDER] - y[..., LEFT_HIP] - y[..., RIGHT_HIP]) / 2
+    return np.degrees(np.arctan2(np.abs(dy), np.abs(dx)))
+
+
+# Signals the exercise definitions can watch besides the JOINT_ANGLES columns
+DERIVED_SIGNALS = {
+    "shoulder_hip_drop": shoulder_hip_drop,
+    "torso_incline": torso_incline,
+}
+
+
+def compute_signals(landmarks):
+    """Every joint angle and derived signal of one frame, computed once, keyed by name."""
+    signals = dict(zip(JOINT_ANGLES, calculate_angles(landmarks).tolist()))
+    for name, signal in DERIVED_SIGNALS.items():
+        signals[name] = float(signal(landmarks))
+    return signals
+
+
+_COMPARISONS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def _matches(value, conditions):
+    """True if the value passes every (operator, threshold) condition."""
+    return all(_COMPARISONS[op](value, threshold) for op, threshold in conditions)
+
+
+def _requirements_met(signals, requires):
+    """True if every signal in ``requires`` passes its own conditions."""
+    return all(_matches(signals[signal], conditions) for signal, conditions in requires.items())
+
+
+# Declarative exercise definitions read by ExerciseDetector.
+#
+#   title           window title and overlay name
+#   reps            rep counters: the signal must pass "reset" before passing "complete"
+#                   counts a rep, which gives the state machine its hysteresis. "stages"
+#                   names the (reset, complete) states; "on_reset"/"on_rep" set feedback.
+#                   "phases" names the movement towards and back from "complete" for the
+#                   tempo analytics, and "mirror" is the other side's signal, compared
+#                   with this one for symmetry.
+#   hold            time accumulates while the signal passes every "while" condition and
+#                   each signal in "requires" passes its own conditions
+#   feedback        the first zone whose "when" conditions pass, and whose "requires"
+#                   signals pass theirs, sets the feedback text
+#   labels          (signal, landmark, format) values drawn next to a landmark
+#   lines           overlay text, formatted with the counters, "feedback" and "hold"
+EXERCISES = {
+    "biceps_curl": {
+        "title": "Biceps Curl Tracker",
+        "reps": {
+            "left": {"signal": "left_elbow", "reset": [(">", 160)], "complete": [("<", 30)]},
+            "right": {"signal": "right_elbow", "reset": [(">", 160)], "complete": [("<", 30)]},
+        },
+        "labels": [("left_elbow", LEFT_ELBOW, "{:.0f}"), ("right_elbow", RIGHT_ELBOW, "{:.0f}")],
+        "lines": ["Left Reps: {left}", "Right Reps: {right}"],
+    },
+    "squat": {
+        "title": "Squat Tracker",
+        "initial_feedback": "Analyzing...",
+        "no_person": "No Person Detected!",
+        "reps": {
+            "squats": {"signal": "left_knee", "stages": ("up", "down"),
+                       "reset": [(">", 160)], "complete": [("<", 100)],
+                       "phases": ("eccentric", "concentric"), "mirror": "right_knee"},
+        },
+        "feedback": {
+            "signal": "left_knee",
+            "zones": [
+                {"when": [(">", 170)], "say": "Too Shallow! Go lower."},
+                {"when": [("<", 60)], "say": "Too Deep! Adjust."},
+                {"when": [], "say": "Perfect Squat!"},
+            ],
+        },
+        "labels": [("left_knee", LEFT_KNEE, "Left: {:.0f}")],
+        "lines": ["{feedback}", "Squats: {squats}"],
+    },
+    "pushups": {
+        "title": "Exercise Tracker",
+        "initial_feedback": "Start Push-Ups!",
+        "no_person": "No Person Detected!",
+        "skeleton_colors": ((245, 117, 66), (245, 66, 230)),
+        "reps": {
+            "pushups": {"signal": "shoulder_hip_drop", "reset": [("<", 0.15)], "complete": [(">", 0.3)],
+                        "phases": ("eccentric", "concentric"),
+                        "on_reset": "Go Lower!", "on_rep": "Complete Push-Up!"},
+        },
+        "lines": ["Push-Ups: {pushups}", "{feedback}"],
+    },
+    "plank": {
+        "title": "Plank Tracker",
+        "initial_feedback": "Start Plank!",
+        "no_person": "No Person Detected!",
+        "skeleton_colors": ((245, 117, 66), (245, 66, 230)),
+        "banner": (245, 117, 16),
+        # A straight body line alone is also just standing up; the torso has to be roughly level
+        "hold": {"signal": "left_body_line", "while": [(">", 160), ("<", 180)],
+                 "requires": {"torso_incline": [("<", 40)]}},
+        "feedback": {
+            "signal": "left_body_line",
+            "zones": [
+                # Same position check as the hold, so the feedback never praises a plank that is not timed
+                {"when": [], "requires": {"torso_incline": [(">=", 40)]}, "say": "Get Into Plank Position!"},
+                {"when": [(">", 160), ("<", 180)], "say": "Good Plank!"},
+                {"when": [("<=", 160)], "say": "Hips Too Low!"},
+                {"when": [(">=", 180)], "say": "Hips Too High!"},
+            ],
+        },
+        "labels": [("left_body_line", LEFT_HIP, "Angle: {:.0f}")],
+        "lines": ["{feedback}", "Time: {hold} sec"],
+    },
+}
+
+
+class RepCounter:
+    """Two-threshold rep state machine for one signal."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.reset_stage, self.complete_stage = spec.get("stages", ("down", "up"))
+        self.stage = self.reset_stage
+        self.count = 0
+
+    def update(self, value):
+        """
+        Advances the state machine.
+
+        Returns:
+            str | None: "reset" or "rep" when that transition happened on this frame.
+        """
+        event = None
+        if _matches(value, self.spec["reset"]):
+            self.stage = self.reset_stage
+            event = "reset"
+        if _matches(value, self.spec["complete"]) and self.stage == self.reset_stage:
+            self.stage = self.complete_stage
+            self.count += 1
+            event = "rep"
+        return event
+
+
+# Seconds of holding that weigh as much as one completed rep when guessing the exercise
+HOLD_SECONDS_PER_REP = 3.0
+
+
+class HoldTimer:
+    """Accumulates the time a signal stays inside a range, resetting when it leaves."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.time = 0.0
+        self.best = 0.0
+        self.total = 0.0
+
+    def update(self, signals, elapsed):
+        """Advances the timer with one frame's compute_signals()."""
+        if (_matches(signals[self.spec["signal"]], self.spec["while"])
+                and _requirements_met(signals, self.spec.get("requires", {}))):
+            self.time += elapsed
+            self.total += elapsed
+            self.best = max(self.best, self.time)
+        else:
+            self.time = 0.0
+
+    def reset(self):
+        self.time = 0.0
+
+
+def _ratio(a, b):
+    """Smaller over larger of two non-negative values, 1.0 meaning equal; None if either is missing."""
+    if a is None or b is None:
+        return None
+    return min(a, b) / max(a, b, 1e-6)
+
+
+class RunningStat:
+    """Count, mean, minimum and maximum of a stream of values, in constant memory."""
+
+    __slots__ = ("count", "mean", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value):
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def summary(self):
+        if not self.count:
+            return None
+        return {"mean": self.mean, "min": self.min, "max": self.max}
+
+
+class RepAnalytics:
+    """
+    Tempo, time under tension, range of motion and symmetry of every rep of one counter.
+
+    A rep runs from the frame its signal leaves the "reset" zone to the frame it returns,
+    with a "complete" in between; the turning point is the frame closest to "complete".
+    Only running statistics are kept, so every frame costs O(1) time and memory. A rest
+    longer than ``rest`` seconds between reps closes the set.
+    """
+
+    def __init__(self, spec, rest=30.0):
+        self.spec = spec
+        self.rest = rest
+        self.phases = spec.get("phases", ("concentric", "eccentric"))
+        # Whether "complete" lies at low or high signal values
+        self.towards_low = spec["complete"][0][0] in ("<", "<=")
+        self.sets = []
+        self.last_rep = None
+        self._last_end = None
+        self._active = False
+        self._new_set()
+
+    def _new_set(self):
+        self.reps = 0
+        self.partial_reps = 0
+        self.time_under_tension = 0.0
+        self.stats = {name: RunningStat() for name in ("duration", self.phases[0], self.phases[1],
+                                                        "range_of_motion", "symmetry")}
+
+    def update(self, value, timestamp, event, mirror_value=None):
+        """
+        Advances by one frame.
+
+        Args:
+            value (float): The counter's signal.
+            timestamp (float): Frame time in seconds.
+            event (str | None): What RepCounter.update() returned for this frame.
+            mirror_value (float, optional): The other side's signal, see "mirror".
+        """
+        at_reset = _matches(value, self.spec["reset"])
+        if not self._active:
+            if not at_reset:
+                self._start(value, timestamp, mirror_value)
+            return
+
+        self._low, self._high = min(self._low, value), max(self._high, value)
+        if value < self._turn_value if self.towards_low else value > self._turn_value:
+            self._turn_value, self._turn_time = value, timestamp
+        if mirror_value is not None:
+            self._mirror_low = min(self._mirror_low, mirror_value)
+            self._mirror_high = max(self._mirror_high, mirror_value)
+        if event == "rep":
+            self._completed = True
+        if at_reset:
+            self._finish(timestamp)
+
+    def _start(self, value, timestamp, mirror_value):
+        if self._last_end is not None and timestamp - self._last_end > self.rest and self.reps:
+            self.sets.append(self.set_summary())
+            self._new_set()
+        self._active = True
+        self._completed = False
+        self._start_time = self._turn_time = timestamp
+        self._low = self._high = self._turn_value = value
+        self._mirror_low = self._mirror_high = mirror_value
+
+    def _finish(self, timestamp):
+        self._active = False
+        if not self._completed:
+            self.partial_reps += 1
+            return
+
+        tension = timestamp - self._start_time
+        # A rep's duration includes the pause before it, unless the set starts with it
+        start = self._last_end if self.reps and self._last_end is not None else self._start_time
+        rep = {
+            "duration": timestamp - start,
+            "time_under_tension": tension,
+            self.phases[0]: self._turn_time - self._start_time,
+            self.phases[1]: timestamp - self._turn_time,
+            "range_of_motion": self._high - self._low,
+        }
+        if self._mirror_low is not None:
+            mirror = self._mirror_high - self._mirror_low
+            rep["symmetry"] = min(rep["range_of_motion"], mirror) / max(rep["range_of_motion"], mirror, 1e-6)
+
+        self.reps += 1
+        self.time_under_tension += tension
+        for name, stat in self.stats.items():
+            if name in rep:
+                stat.add(rep[name])
+        self.last_rep = rep
+        self._last_end = timestamp
+
+    def set_summary(self):
+        """Rep count, total time under tension and per-rep statistics of the current set."""
+        summary = {"reps": self.reps, "partial_reps": self.partial_reps,
+                   "time_under_tension": self.time_under_tension}
+        for name, stat in self.stats.items():
+            if stat.count:
+                summary[name] = stat.summary()
+        return summary
+
+    def summary(self):
+        """Summaries of every set so far, the current one last."""
+        return self.sets + [self.set_summary()] if self.reps or self.partial_reps else list(self.sets)
+
+
+class ExerciseDetector:
+    """
+    Rep, hold and feedback tracking for one exercise, driven by its EXERCISES definition.
+
+    Detectors are what PostureAnalyzer.run() drives: update() advances the state from a
+    LandmarkFrame, draw() renders the overlay and summary() reports the results.
+    """
+
+    def __init__(self, name, definition=None):
+        self.name = name
+        self.definition = EXERCISES[name] if definition is None else definition
+        self.window_name = self.definition["title"]
+        self.drawing_specs = tuple(mp.solutions.drawing_utils.DrawingSpec(color=color, thickness=2, circle_radius=2)
+                                   for color in self.definition.get("skeleton_colors", ()))
+        self.counters = {counter: RepCounter(spec) for counter, spec in self.definition.get("reps", {}).items()}
+        self.analytics = {counter: RepAnalytics(spec) for counter, spec in self.definition.get("reps", {}).items()}
+        self.hold = HoldTimer(self.definition["hold"]) if "hold" in self.definition else None
+        self.feedback = self.definition.get("initial_feedback", "")
+        self.signals = {}
+        self.last_timestamp = None
+        self.last_activity = None
+        self.overlay = OverlayRenderer()
+
+    def update(self, frame, signals=None):
+        """
+        Advances the detector by one frame.
+
+        Args:
+            frame (LandmarkFrame): The current landmarks.
+            signals (dict, optional): compute_signals() of the frame, when the caller
+                already computed it for several detectors.
+        """
+        # Time holds with the real frame timestamps rather than an assumed frame rate
+        elapsed = 0 if self.last_timestamp is None else frame.timestamp - self.last_timestamp
+        self.last_timestamp = frame.timestamp
+
+        if not frame.detected:
+            self.feedback = self.definition.get("no_person", self.feedback)
+            if self.hold is not None:
+                self.hold.reset()
+            return
+        self.signals = compute_signals(frame.data) if signals is None else signals
+
+        for name, counter in self.counters.items():
+            value = self.signals[counter.spec["signal"]]
+            event = counter.update(value)
+            self.analytics[name].update(value, frame.timestamp, event, self.signals.get(counter.spec.get("mirror")))
+            if event == "rep":
+                self.last_activity = frame.timestamp
+            if event and counter.spec.get("on_" + event):
+                self.feedback = counter.spec["on_" + event]
+
+        if self.hold is not None:
+            self.hold.update(self.signals, elapsed)
+            if self.hold.time > 0:
+                self.last_activity = frame.timestamp
 
-                # Flip the frame horizontally
-                frame = cv2.flip(frame, 1)
-
-                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = self.pose.process(image)
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-                try:
-                    landmarks = results.pose_landmarks.landmark
-
-                    # Left arm
-                    left_shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                                     landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                    left_elbow = [landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                                  landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-                    left_wrist = [landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                                  landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-                    left_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-
-                    if left_angle > 160:
-                        left_stage = "down"
-                    if left_angle < 30 and left_stage == "down":
-                        left_stage = "up"
-                        left_counter += 1
-
-                    # Right arm
-                    right_shoulder = [landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-                                      landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-                    right_elbow = [landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].x,
-                                   landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].y]
-                    right_wrist = [landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].x,
-                                   landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].y]
-                    right_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
-
-                    if right_angle > 160:
-                        right_stage = "down"
-                    if right_angle < 30 and right_stage == "down":
-                        right_stage = "up"
-                        right_counter += 1
-
-                    # Visualize angles
-                    cv2.putText(image, str(int(left_angle)), tuple(np.multiply(left_elbow, [640, 480]).astype(int)),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255),  2, cv2.LINE_AA)
-                    cv2.putText(image, str(int(right_angle)), tuple(np.multiply(right_elbow, [640, 480]).astype(int)),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA)
-
-                except Exception as e:
-                    print(f"Keypoints not detected: {e}")
-                    continue
-
-                cv2.putText(image, f"Left Reps: {left_counter}", (10, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-                cv2.putText(image, f"Right Reps: {right_counter}", (10, 80),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-
-                self.mp_drawing.draw_landmarks(image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-                cv2.imshow('Biceps Curl Tracker', image)
-
-                if cv2.waitKey(10) & 0xFF == ord('q'):
+        feedback = self.definition.get("feedback")
+        if feedback is not None:
+            value = self.signals[feedback["signal"]]
+            for zone in feedback["zones"]:
+                if _matches(value, zone["when"]) and _requirements_met(self.signals, zone.get("requires", {})):
+                    self.feedback = zone["say"]
                     break
 
-        finally:
-            self.release_camera()
+    def activity(self):
+        """How much of this exercise was done: completed reps plus held time in rep equivalents."""
+        reps = sum(counter.count for counter in self.counters.values())
+        held = self.hold.total / HOLD_SECONDS_PER_REP if self.hold is not None else 0.0
+        return reps + held
 
-    def analyze_squat(self):
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Failed to capture video.")
-                break
+    def overlay_values(self):
+        """Values available to the "lines" templates."""
+        values = {counter: rep_counter.count for counter, rep_counter in self.counters.items()}
+        values["feedback"] = self.feedback
+        values["hold"] = int(self.hold.time) if self.hold is not None else 0
+        return values
 
-            # Flip the frame horizontally
-            frame = cv2.flip(frame, 1)
+    def draw(self, image, landmarks):
+        if landmarks is not None:
+            for signal, landmark, text in self.definition.get("labels", ()):
+                if signal in self.signals:
+                    self.overlay.label(image, text.format(self.signals[signal]), landmarks[landmark, :2])
 
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image.flags.writeable = False
-            results = self.pose.process(image)
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        values = self.overlay_values()
+        self.overlay.panel(image, [line.format(**values) for line in self.definition.get("lines", ())],
+                           self.definition.get("banner"))
 
-            feedback = "Analyzing..."
-            try:
-                landmarks = results.pose_landmarks.landmark
-
-                left_hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                            landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-                left_knee = [landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                             landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-                left_ankle = [landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-                              landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-                left_knee_angle = calculate_angle(left_hip, left_knee, left_ankle)
-
-                if left_knee_angle > 170:
-                    feedback = "Too Shallow! Go lower."
-                elif left_knee_angle < 60:
-                    feedback = "Too Deep! Adjust."
-                else:
-                    feedback = "Perfect Squat!"
-
-                cv2.putText(image, f"Left: {int(left_knee_angle)}",
-                            tuple(np.multiply(left_knee, [640, 480]).astype(int)),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA)
+    def summary(self):
+        summary = {"reps": {counter: rep_counter.count for counter, rep_counter in self.counters.items()}}
+        if self.hold is not None:
+            summary["hold_time"] = self.hold.time
+            summary["best_hold_time"] = self.hold.best
+        if self.feedback:
+            summary["feedback"] = self.feedback
+        if self.analytics:
+            summary["sets"] = {counter: analytics.summary() for counter, analytics in self.analytics.items()}
+        if len(self.analytics) == 2:
+            # Sides counted separately, e.g. left and right curls: compare their sets
+            summary["side_symmetry"] = [_ratio(*(side.get("range_of_motion", {}).get("mean") for side in sides))
+                                        for sides in zip(*summary["sets"].values())]
+        return summary
 
-            except Exception as e:
-                feedback = "No Person Detected!"
-                print(f"Error: {e}")
 
-            cv2.putText(image, feedback, (10, 40),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-            self.mp_drawing.draw_landmarks(image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-            cv2.imshow('Squat Tracker', image)
+class ExerciseEngine:
+    """
+    Runs several exercise detectors on the same landmark frame.
 
-            if cv2.waitKey(10) & 0xFF == ord('q'):
-                break
+    The signals are computed once per frame and shared, so watching every exercise costs
+    no more inference than watching one. The engine can be passed to PostureAnalyzer.run()
+    like a single detector; it then shows whichever exercise guess_exercise() picks.
+    """
 
-        self.release_camera()
+    window_name = 'Exercise Tracker'
 
-    def analyze_pushups(self):
-        pushup_counter = 0
-        pushup_stage = "down"
-        feedback_pushup = "Start Push-Ups!"
+    def __init__(self, names=None):
+        self.detectors = {name: ExerciseDetector(name) for name in (names or EXERCISES)}
+        self.signals = {}
+        self.overlay = OverlayRenderer()
 
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Failed to capture video.")
-                break
+    def update(self, frame):
+        self.signals = compute_signals(frame.data) if frame.detected else {}
+        for detector in self.detectors.values():
+            detector.update(frame, self.signals)
 
-            # Flip the frame horizontally
-            frame = cv2.flip(frame, 1)
+    def guess_exercise(self):
+        """
+        Returns the name of the exercise with the most completed reps and hold time (see
+        ExerciseDetector.activity), the most recent one on a tie, or None if no detector
+        has seen any activity yet.
+        """
+        active = [detector for detector in self.detectors.values() if detector.activity() > 0]
+        if not active:
+            return None
+        return max(active, key=lambda detector: (detector.activity(), detector.last_activity)).name
 
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image.flags.writeable = False
-            results = self.pose.process(image)
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    @property
+    def drawing_specs(self):
+        guess = self.guess_exercise()
+        return self.detectors[guess].drawing_specs if guess else ()
 
-            try:
-                landmarks = results.pose_landmarks.landmark
-
-                left_shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                                 landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                right_shoulder = [landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]. x,
-                                  landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-                left_hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                            landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-                right_hip = [landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].x,
-                             landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-
-                shoulder_avg_y = (left_shoulder[1] + right_shoulder[1]) / 2
-                hip_avg_y = (left_hip[1] + right_hip[1]) / 2
-
-                if shoulder_avg_y - hip_avg_y < 0.15:
-                    pushup_stage = "down"
-                    feedback_pushup = "Go Lower!"
-                if shoulder_avg_y - hip_avg_y > 0.3 and pushup_stage == "down":
-                    pushup_stage = "up"
-                    pushup_counter += 1
-                    feedback_pushup = "Complete Push-Up!"
-
-                cv2.putText(image, f"Push-Ups: {pushup_counter}", (10, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-                cv2.putText(image, feedback_pushup, (10, 80),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-
-                self.mp_drawing.draw_landmarks(image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS,
-                                               self.mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2),
-                                               self.mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2))
+    def draw(self, image, landmarks):
+        guess = self.guess_exercise()
+        if guess is None:
+            self.overlay.panel(image, ["Start exercising!"])
+        else:
+            self.detectors[guess].draw(image, landmarks)
+
+    def summary(self):
+        return {name: detector.summary() for name, detector in self.detectors.items()}
+
+
+# Landmarks whose movement decides the inference cadence: every joint an angle is measured on
+_TRACKED_LANDMARKS = np.unique(_ANGLE_POINTS)
+
+
+class AdaptiveCadence:
+    """
+    Decides how often pose inference runs, based on how fast the joints are moving.
+
+    While the tracked joints move slower than ``slow_speed`` the interval between
+    inferences grows by one frame up to ``max_interval``; any movement faster than
+    ``fast_speed`` drops it straight back to every frame. Skipped frames get landmarks
+    extrapolated from the last two inferences, so the rep state machines keep seeing a
+    smooth signal. The inferred frames are kept in ``history``, a LandmarkHistory that
+    other temporal features can read as well.
+
+    Speeds are in normalized image units per second (1.0 crosses the whole frame).
+    """
+
+    def __init__(self, max_interval=4, slow_speed=0.15, fast_speed=0.5, max_horizon=0.25):
+        self.max_interval = max_interval
+        self.slow_speed = slow_speed
+        self.fast_speed = fast_speed
+        self.max_horizon = max_horizon
+        self.interval = 1
+        self.speed = 0.0
+        self.inferred = 0
+        self.skipped = 0
+        self._since_inference = 0
+        # Inferred frames since the pose was last lost, newest last
+        self.history = LandmarkHistory()
+        self._velocity = np.zeros((NUM_LANDMARKS, 2), dtype=np.float32)
+
+    def should_infer(self):
+        """Call once per frame; True if this frame needs a real inference."""
+        self._since_inference += 1
+        if not len(self.history) or self._since_inference >= self.interval:
+            self._since_inference = 0
+            return True
+        return False
+
+    def observe(self, frame):
+        """Feed the result of a real inference and adapt the interval to the joint speed."""
+        self.inferred += 1
+        if not frame.detected:
+            # Look again on the very next frame until somebody is found
+            self.history.clear()
+            self.interval = 1
+            return
+
+        self.history.push(frame)
+        if len(self.history) < 2 or self.history.time(0) <= self.history.time(1):
+            self._velocity[:] = 0
+            return
+
+        np.subtract(self.history.latest(0)[:, :2], self.history.latest(1)[:, :2], out=self._velocity)
+        self._velocity /= self.history.time(0) - self.history.time(1)
+        self.speed = float(np.max(np.hypot(self._velocity[_TRACKED_LANDMARKS, 0],
+                                           self._velocity[_TRACKED_LANDMARKS, 1])))
+        if self.speed > self.fast_speed:
+            self.interval = 1
+        elif self.speed < self.slow_speed:
+            self.interval = min(self.interval + 1, self.max_interval)
+
+    def predict(self, frame, timestamp):
+        """Fill a LandmarkFrame with landmarks extrapolated from the last two inferences."""
+        self.skipped += 1
+        horizon = min(timestamp - self.history.time(0), self.max_horizon)
+        frame.data[:] = self.history.latest(0)
+        frame.data[:, :2] += self._velocity * horizon
+        frame.detected = True
+        frame.timestamp = timestamp
+
+    @property
+    def inference_ratio(self):
+        """Share of frames that ran a real inference."""
+        total = self.inferred + self.skipped
+        return self.inferred / total if total else 1.0
+
+
+class RoiTracker:
+    """
+    Crops the input of ``pose.process`` to a padded box around the previous pose.
+
+    The box only moves when the pose gets close to its edge or shrinks well inside it, so
+    MediaPipe's own frame-to-frame tracking keeps seeing a stable input. That tracking
+    works in the coordinates of the previous input, so the graph is reset whenever the
+    region it is given changes. Landmarks found in the crop are mapped back to full-frame
+    coordinates in place. When the crop loses the person the same frame is re-run on the
+    full image and tracking starts over.
+    """
+
+    def __init__(self, padding=0.25, margin=0.1, min_visibility=0.5, min_size=96):
+        self.padding = padding
+        self.margin = margin
+        self.min_visibility = min_visibility
+        self.min_size = min_size
+        self.box = None
+        self.cropped = 0
+        self.lost = 0
+        # Region of the previous pass, None for the full frame
+        self._region = None
+
+    def _process(self, pose_model, image, region):
+        if region != self._region:
+            # The graph's tracking window belongs to the old region, start over
+            pose_model.reset()
+            self._region = region
+        return pose_model.process(image)
+
+    def process(self, pose_model, image):
+        """Run ``pose_model.process`` on the tracked region of an RGB image."""
+        height, width = image.shape[:2]
+        if self.box is None:
+            results = self._process(pose_model, image, None)
+        else:
+            x0, y0, x1, y1 = self.box
+            crop = np.ascontiguousarray(image[y0:y1, x0:x1])
+            crop.flags.writeable = False
+            results = self._process(pose_model, crop, self.box)
+            if results.pose_landmarks is None:
+                # Tracking lost, look at the whole frame again
+                self.lost += 1
+                self.box = None
+                results = self._process(pose_model, image, None)
+            else:
+                self.cropped += 1
+                scale_x, scale_y = (x1 - x0) / width, (y1 - y0) / height
+                for lm in results.pose_landmarks.landmark:
+                    lm.x = x0 / width + lm.x * scale_x
+                    lm.y = y0 / height + lm.y * scale_y
+                    lm.z *= scale_x
+
+        self.box = self._next_box(results.pose_landmarks, width, height)
+        return results
+
+    def _next_box(self, pose_landmarks, width, height):
+        if pose_landmarks is None:
+            return None
+        points = np.array([(lm.x * width, lm.y * height) for lm in pose_landmarks.landmark
+                           if lm.visibility >= self.min_visibility], dtype=np.float32)
+        if len(points) < 2:
+            return None
+        (left, top), (right, bottom) = points.min(axis=0), points.max(axis=0)
+
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            margin_x, margin_y = (x1 - x0) * self.margin, (y1 - y0) * self.margin
+            inside = (left >= x0 + margin_x or x0 == 0) and (right <= x1 - margin_x or x1 == width) \
+                and (top >= y0 + margin_y or y0 == 0) and (bottom <= y1 - margin_y or y1 == height)
+            still_fits = (right - left) * (bottom - top) > 0.25 * (x1 - x0) * (y1 - y0)
+            if inside and still_fits:
+                return self.box
+
+        pad = self.padding * max(right - left, bottom - top, self.min_size)
+        x0, y0 = int(max(left - pad, 0)), int(max(top - pad, 0))
+        x1, y1 = int(min(right + pad, width)), int(min(bottom + pad, height))
+        if (x1 - x0) * (y1 - y0) > 0.8 * width * height:
+            # Barely smaller than the frame, not worth cropping
+            return None
+        return x0, y0, x1, y1
+
+
+class PresenceGate:
+    """
+    Idles pose inference while nobody is in front of the camera.
+
+    After ``idle_after`` seconds without a pose, frames are no longer sent to the full
+    pipeline. Each idle frame only gets a tiny grayscale thumbnail compared with the
+    previous one; pose inference runs on a downscaled copy of the frame when that shows
+    motion, or every ``check_interval`` seconds otherwise. Full inference resumes as soon
+    as such a check finds a person.
+    """
+
+    def __init__(self, idle_after=2.0, check_interval=1.0, motion_threshold=6.0, check_width=320):
+        self.idle_after = idle_after
+        self.check_interval = check_interval
+        self.motion_threshold = motion_threshold
+        self.check_width = check_width
+        self.idle = False
+        self.checks = 0
+        self.skipped = 0
+        self._last_seen = None
+        self._last_check = None
+        self._thumbnails = [np.zeros((48, 64), dtype=np.uint8), np.zeros((48, 64), dtype=np.uint8)]
+        self._small = None
+        self._small_rgb = None
+
+    def observe(self, detected, timestamp):
+        """Feeds the outcome of a full inference; returns True when it switches to idle."""
+        if detected or self._last_seen is None:
+            self._last_seen = timestamp
+        if not detected and timestamp - self._last_seen >= self.idle_after:
+            self.idle = True
+            self._last_check = timestamp
+            return True
+        return False
+
+    def _moved(self, image):
+        gray = cv2.cvtColor(cv2.resize(image, (64, 48), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY,
+                            dst=self._thumbnails[0])
+        motion = cv2.norm(gray, self._thumbnails[1], cv2.NORM_L1) / gray.size
+        self._thumbnails.reverse()
+        return motion > self.motion_threshold
+
+    def check(self, pose_model, image, timestamp):
+        """
+        Looks for a person on an idle frame.
+
+        Args:
+            pose_model: The pose graph, used on a downscaled copy of the frame.
+            image (np.ndarray): The flipped BGR frame.
+            timestamp (float): Frame time in seconds.
+
+        Returns:
+            The ``pose.process`` results of the check, or None if the frame was skipped.
+            A result with a pose ends the idle mode.
+        """
+        moved = self._moved(image)
+        if not moved and timestamp - self._last_check < self.check_interval:
+            self.skipped += 1
+            return None
+        self._last_check = timestamp
+        self.checks += 1
+
+        height, width = image.shape[:2]
+        size = (self.check_width, round(height * self.check_width / width))
+        if self._small is None or self._small.shape[:2] != size[::-1]:
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._small_rgb = np.empty_like(self._small)
+        cv2.resize(image, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=self._small_rgb)
+        rgb.flags.writeable = False
+        results = pose_model.process(rgb)
+        rgb.flags.writeable = True
+        if results.pose_landmarks is not None:
+            self.idle = False
+            self._last_seen = timestamp
+        return results
+
+
+class BufferRing:
+    """
+    Round-robin set of reusable image buffers.
+
+    A buffer handed out is only reused after ``count`` more have been handed out, which
+    covers every frame still in flight between the pipeline stages.
+    """
+
+    def __init__(self, count=4):
+        self.buffers = [None] * count
+        self.index = 0
+
+    def next(self, shape, dtype=np.uint8):
+        """The next buffer, reallocated only if the frame shape changed."""
+        buffer = self.buffers[self.index]
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[self.index] = np.empty(shape, dtype=dtype)
+        self.index = (self.index + 1) % len(self.buffers)
+        return buffer
+
+    def current(self):
+        """The buffer next in line, or None before it has been filled once."""
+        return self.buffers[self.index]
+
+    def store(self, buffer):
+        """Keep an array filled in place of current(), e.g. by ``cap.read()``, and move on."""
+        self.buffers[self.index] = buffer
+        self.index = (self.index + 1) % len(self.buffers)
 
+
+def frame_timestamp(cap, index):
+    """
+    Time of the frame just read, in seconds.
+
+    Uses the video's own clock, so results do not depend on processing speed. Some
+    containers and backends report no position; then the frame index and frame rate
+    give the time instead.
+
+    Args:
+        cap (cv2.VideoCapture): The video, right after reading frame ``index``.
+        index (int): Zero-based index of that frame.
+    """
+    position = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if position > 0 or index == 0:
+        return position / 1000.0
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return index / fps if fps > 0 else 0.0
+
+
+class PostureAnalyzer:
+    def __init__(self, model_complexity=1, pose_model=None, backend="solutions", offline=False):
+        """
+        Args:
+            model_complexity (int): MediaPipe Pose model complexity, 0, 1 or 2.
+            pose_model (optional): An existing Pose graph to run, e.g. one from a PosePool.
+                One is built when omitted.
+            backend (str): "solutions" for the blocking ``mp.solutions.pose.Pose`` graph or
+                "tasks" for the asynchronous PoseLandmarker, see PoseBackend.
+            offline (bool): Frames come from a recording, not a live camera, so the tasks
+                backend infers each of them synchronously instead of asynchronously.
+        """
+        self.model_complexity = model_complexity
+        self.backend = backend
+        self.offline = offline
+        if pose_model is None:
+            pose_model = create_pose_model(model_complexity, backend, offline)
+        self.pose = pose_model
+        self.cap = None
+        self.resolution = None
+        self.tuner = None
+        self._pending_resolution = None
+        # Frames in flight between the pipeline stages each keep their own buffer
+        self.capture_buffers = BufferRing()
+        self.image_buffers = BufferRing()
+        self._rgb = None
+        self.frame = LandmarkFrame()
+        # Frame time of the newest tracked asynchronous result
+        self._inferred_at = float("-inf")
+        self.stop_event = threading.Event()
+        self.timer = FrameTimer()
+        self.show_timings = False
+        self.cadence = None
+        self.roi = None
+        self.presence = None
+        self.recorder = None
+        self.overlay = OverlayRenderer()
+
+    def start_camera(self):
+        """Subscribe to the shared, low-latency camera, see CameraManager."""
+        self.cap = open_camera(0)
+        self._pending_resolution = self.resolution
+
+    def apply_setting(self, setting):
+        """
+        Switches to a (model_complexity, (width, height)) setting.
+
+        The Pose graph is rebuilt right away, so call this from the thread that runs
+        inference. The capture resolution changes before the next frame is read.
+        """
+        model_complexity, self.resolution = setting
+        if model_complexity != self.model_complexity:
+            try:
+                pose_model = create_pose_model(model_complexity, self.backend, self.offline)
             except Exception as e:
-                feedback_pushup = "No Person Detected!"
-                print(f"Error: {e}")
+                print(f"Could not load model complexity {model_complexity}: {e}")
+            else:
+                self.pose.close()
+                self.pose = pose_model
+                self.model_complexity = model_complexity
+        self._pending_resolution = self.resolution
 
-            cv2.imshow('Exercise Tracker', image)
+    def _apply_pending_resolution(self):
+        if self._pending_resolution is not None and self.cap is not None:
+            width, height = self._pending_resolution
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self._pending_resolution = None
 
-            if cv2.waitKey(10) & 0xFF == ord('q'):
-                break
+    def auto_tune(self, target_fps=25, retune=False, resolutions=RESOLUTIONS):
+        """
+        Picks the model complexity and capture resolution for this machine, see PoseTuner.
+
+        The first call on a machine benchmarks it on a bundled photo and saves the
+        result; later calls load it. While running, the setting is stepped down while
+        frames keep exceeding the budget and back up once they stay well within it.
+
+        Args:
+            target_fps (int): Frame rate to reach.
+            retune (bool): Benchmark again even if a setting was saved.
+            resolutions (tuple): Candidate capture sizes, largest first.
+
+        Returns:
+            tuple: The chosen (model_complexity, (width, height)).
+        """
+        tuner = PoseTuner(target_fps, self.backend, resolutions)
+        setting = tuner.tune(retune)
+        self.apply_setting(setting)
+        self.tuner = tuner.runtime(setting)
+        return setting
+
+    def release_camera(self, close_windows=True):
+        """Release the camera (a shared camera stays open for its other users) and close all OpenCV windows."""
+        if self.cap is not None:
+            self.cap.release()
+            if close_windows:
+                cv2.destroyAllWindows()
+
+    def read_frame(self):
+        """``cap.read()`` into a reused capture buffer."""
+        ret, frame = self.cap.read(self.capture_buffers.current())
+        if ret:
+            self.capture_buffers.store(frame)
+        return ret, frame
+
+    def update_landmarks(self, results, timestamp=None):
+        """Store the landmarks of a ``pose.process`` result in self.frame."""
+        return self.frame.update(results.pose_landmarks, timestamp)
+
+    def infer(self, frame, *trackers, timestamp=None):
+        """
+        Runs pose detection on one captured frame and advances the exercise trackers.
+
+        Args:
+            frame (np.ndarray): BGR frame as returned by ``cap.read()``.
+            *trackers: ExerciseDetector or ExerciseEngine objects updated from this single inference.
+            timestamp (float, optional): Frame time in seconds. Defaults to time.monotonic().
+
+        Returns:
+            tuple: The flipped BGR image and the ``pose.process`` results,
+                or results without a pose when self.cadence skipped inference on this
+                frame or while self.presence is idle; self.frame holds the landmarks then.
+        """
+        timer = self.timer
+        start = timer.now()
+        if timestamp is None:
+            timestamp = start
+
+        # Flip the frame horizontally into a reused buffer; the caller's frame is left alone
+        image = cv2.flip(frame, 1, dst=self.image_buffers.next(frame.shape))
+        flipped = timer.since("flip", start)
+
+        if self.presence is not None and self.presence.idle:
+            results = self.presence.check(self.pose, image, timestamp)
+            if results is None or results.pose_landmarks is None:
+                # Nobody there yet: the trackers see an empty frame, no full inference
+                self.update_landmarks(results or LandmarkerResults(), timestamp)
+                for tracker in trackers:
+                    tracker.update(self.frame)
+                timer.since("idle", flipped)
+                return image, results or LandmarkerResults()
+            print("Person detected, resuming pose tracking.")
+            # The check already found the pose, carry on with its landmarks
+            if self.roi is not None:
+                self.roi.box = None
+            return self._track(image, results, trackers, timestamp, flipped)
+
+        if self.cadence is not None and not self.cadence.should_infer():
+            # Skip inference and carry the pose forward from the last ones
+            self.cadence.predict(self.frame, timestamp)
+            for tracker in trackers:
+                tracker.update(self.frame)
+            timer.since("angles", flipped)
+            return image, LandmarkerResults()
 
-        self.release_camera()
+        # MediaPipe needs RGB; drawing happens on the flipped BGR image, so no conversion back
+        if self._rgb is None or self._rgb.shape != image.shape:
+            self._rgb = np.empty_like(image)
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        converted = timer.since("color", flipped)
+        rgb.flags.writeable = False
+        results = self.pose.process(rgb) if self.roi is None else self.roi.process(self.pose, rgb)
+        rgb.flags.writeable = True
+        timer.since("pose", converted)
+        return self._track(image, results, trackers, timestamp, flipped)
 
-    def analyze_plank(self):
-        plank_status = "Start Plank!"
-        plank_time = 0  # Time in seconds for maintaining a good plank
+    def _track(self, image, results, trackers, timestamp, flipped):
+        """Store inferred landmarks and advance the trackers, the second half of infer()."""
+        inferred_at = getattr(results, "timestamp", None)
+        if inferred_at is not None:
+            if inferred_at <= self._inferred_at:
+                # An asynchronous backend handed back results that were already tracked
+                return image, results
+            self._inferred_at = inferred_at
+            # The landmarks belong to the earlier frame they were inferred on
+            timestamp = inferred_at
+        timer = self.timer
+        start = timer.now()
+        was_detected = self.frame.detected
+        if not self.update_landmarks(results, timestamp) and was_detected:
+            # Logged once when the person is lost rather than on every empty frame
+            print("Keypoints not detected.")
+        if self.presence is not None and self.presence.observe(self.frame.detected, timestamp):
+            print("Nobody in view, pausing pose tracking until someone steps in.")
+        if self.recorder is not None:
+            self.recorder.record(self.frame)
+        if self.cadence is not None:
+            self.cadence.observe(self.frame)
+        for tracker in trackers:
+            tracker.update(self.frame)
+        end = timer.since("angles", start)
 
+        if self.tuner is not None:
+            setting = self.tuner.observe(end - flipped)
+            if setting is not None:
+                print(f"Frame load changed, switching to model complexity {setting[0]} at "
+                      f"{setting[1][0]}x{setting[1][1]}.")
+                self.apply_setting(setting)
+        return image, results
+
+    def annotate(self, image, landmarks, tracker):
+        """Draw the tracker feedback and skeleton on the image."""
+        start = self.timer.now()
+        tracker.draw(image, landmarks)
+        self.overlay.skeleton(image, landmarks, *tracker.drawing_specs)
+        if self.show_timings:
+            self.timer.draw(image)
+        self.timer.since("draw", start)
+
+    def render(self, image, landmarks, tracker):
+        """Draw the tracker feedback and skeleton on the image and show it."""
+        self.annotate(image, landmarks, tracker)
+        start = self.timer.now()
+        cv2.imshow(tracker.window_name, image)
+        self.timer.since("display", start)
+
+    def stop(self):
+        """Ask a running analysis loop to finish after the current frame. Safe from any thread."""
+        self.stop_event.set()
+
+    def run(self, tracker, pipelined=False, headless=False, callback=None, show_timings=False, adaptive=False,
+            roi=False, record=None, idle=False, source_clock=False):
+        """
+        Runs an exercise tracker on the camera until it is stopped or capture fails.
+
+        Args:
+            tracker: An ExerciseDetector, e.g. ExerciseDetector("squat"), or an ExerciseEngine.
+            pipelined (bool): Run capture and inference on their own threads instead of
+                one after another on the calling thread.
+            headless (bool): Open no OpenCV windows and skip the ``cv2.waitKey`` delay, so
+                frames are analyzed as fast as the source delivers them. Stop the loop
+                with stop() or by reaching the end of the source.
+            callback (callable, optional): Called after every analyzed frame with
+                ``(image, results, landmarks, tracker)``, where results are those of infer().
+            show_timings (bool): Overlay the per-stage latency percentiles on the frame.
+                The statistics are always collected in self.timer.
+            adaptive (bool): Run inference less often while the joints move slowly and
+                extrapolate the landmarks in between, see AdaptiveCadence.
+            roi (bool): Run inference on a crop around the previous pose, see RoiTracker.
+            record (str, optional): Trace file that receives the landmarks of every
+                inferred frame, for replaying later with PoseTrace.replay().
+            idle (bool): Pause full inference while nobody is in view, see PresenceGate.
+            source_clock (bool): Time the frames of a video file with its own clock, see
+                frame_timestamp(), instead of when they were read, so hold times and rep
+                durations do not depend on how fast the file is analyzed.
+
+        Returns:
+            The tracker, holding the final counts.
+        """
+        self.stop_event.clear()
+        self.timer = FrameTimer()
+        self.show_timings = show_timings
+        self.cadence = None
+        if adaptive and self.backend != "solutions" and not self.offline:
+            # Live results arrive a frame late, after the extrapolated frames they would anchor
+            print("Adaptive cadence needs the solutions backend or an offline source, inferring every frame.")
+        elif adaptive:
+            self.cadence = AdaptiveCadence()
+        self.roi = None
+        if roi and self.backend != "solutions":
+            # Asynchronous results belong to an earlier crop, so they cannot be mapped back
+            print("ROI cropping needs the solutions backend, running on full frames.")
+        elif roi:
+            self.roi = RoiTracker()
+        self.presence = PresenceGate() if idle else None
+        self.recorder = TraceRecorder(record) if record else None
+        present = self._presenter(headless, callback, 1 if pipelined else 10)
+        try:
+            if pipelined:
+                self._run_pipelined(tracker, present, headless, source_clock)
+            else:
+                self._run_sequential(tracker, present, source_clock)
+        finally:
+            self.release_camera(close_windows=not headless)
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+        return tracker
+
+    def _presenter(self, headless, callback, delay):
+        """Build the function that hands an analyzed frame on; it returns False to stop."""
+        def present(image, results, landmarks, tracker, captured_at):
+            if callback is not None:
+                callback(image, results, landmarks, tracker)
+            if headless:
+                self.timer.frame_done(captured_at)
+                return not self.stop_event.is_set()
+            self.render(image, landmarks, tracker)
+            start = self.timer.now()
+            key = cv2.waitKey(delay)
+            self.timer.since("display", start)
+            self.timer.frame_done(captured_at)
+            return key & 0xFF != ord('q') and not self.stop_event.is_set()
+        return present
+
+    def _run_sequential(self, tracker, present, source_clock):
+        index = 0
         while True:
-            ret, frame = self.cap.read()
+            self._apply_pending_resolution()
+            start = self.timer.now()
+            ret, frame = self.read_frame()
             if not ret:
                 print("Failed to capture video.")
                 break
+            captured_at = self.timer.since("capture", start)
+            timestamp = frame_timestamp(self.cap, index) if source_clock else captured_at
+            index += 1
 
-            # Flip the frame horizontally
-            frame = cv2.flip(frame, 1)
+            image, results = self.infer(frame, tracker, timestamp=timestamp)
+            if not present(image, results, self.frame.data if self.frame.detected else None, tracker,
+                           captured_at):
+                break
 
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image.flags.writeable = False
-            results = self.pose.process(image)
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def _run_pipelined(self, tracker, present, headless, source_clock):
+        """
+        Capture, inference and render stages joined by latest-frame-wins queues.
 
-            try:
-                landmarks = results.pose_landmarks.landmark
-
-                left_shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                                 landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                left_hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                            landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-                left_ankle = [landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-                              landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-
-                plank_angle = calculate_angle(left_shoulder, left_hip, left_ankle)
-
-                if plank_angle > 160 and plank_angle < 180:
-                    plank_status = "Good Plank!"
-                    plank_time += 1 / 30  # Assuming 30 FPS for the webcam
-                elif plank_angle <= 160:
-                    plank_status = "Hips Too Low!"
-                    plank_time = 0
-                elif plank_angle >= 180:
-                    plank_status = "Hips Too High!"
-                    plank_time = 0
-
-                cv2.putText(image, f"Angle: {int(plank_angle)}",
-                            tuple(np.multiply(left_hip, [640, 480]).astype(int)),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA)
+        Capture and inference run on worker threads; rendering stays on the calling
+        thread because OpenCV windows must be driven from it. A stage that falls
+        behind drops stale frames instead of letting them pile up.
+        """
+        captured = LatestFrameQueue()
+        analyzed = LatestFrameQueue()
+        stop = threading.Event()
 
-            except Exception as e:
-                plank_status = "No Person Detected!"
-                plank_time = 0
-                print(f"Error: {e}")
+        def capture():
+            index = 0
+            while not stop.is_set():
+                self._apply_pending_resolution()
+                start = self.timer.now()
+                ret, frame = self.read_frame()
+                if not ret:
+                    print("Failed to capture video.")
+                    break
+                captured_at = self.timer.since("capture", start)
+                captured.put((frame, captured_at, frame_timestamp(self.cap, index) if source_clock else captured_at))
+                index += 1
+            captured.close()
 
-            cv2.rectangle(image, (0, 0), (640, 100), (245, 117, 16), -1)
-            cv2.putText(image, plank_status, (10, 40),
-                        cv2.FONT_HERSHEY_SIMPLEX , 1, (255, 255, 255), 2, cv2.LINE_AA)
-            cv2.putText(image, f"Time: {int(plank_time)} sec", (10, 80),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+        def inference():
+            while True:
+                item = captured.get()
+                if item is None:
+                    break
+                frame, captured_at, timestamp = item
+                image, results = self.infer(frame, tracker, timestamp=timestamp)
+                # Copy the landmarks, self.frame is overwritten by the next inference
+                landmarks = self.frame.data.copy() if self.frame.detected else None
+                analyzed.put((image, results, landmarks, tracker, captured_at))
+            analyzed.close()
 
-            self.mp_drawing.draw_landmarks(image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS,
-                                      self.mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2),
-                                      self.mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2))
+        workers = [threading.Thread(target=capture, daemon=True),
+                   threading.Thread(target=inference, daemon=True)]
+        for worker in workers:
+            worker.start()
 
-            cv2.imshow('Plank Tracker', image)
+        try:
+            while True:
+                item = analyzed.get(timeout=0.1)
+                self.timer.dropped = captured.dropped + analyzed.dropped
+                if item is not None:
+                    if not present(*item):
+                        break
+                elif analyzed.closed or self.stop_event.is_set():
+                    break
+                elif not headless and cv2.waitKey(1) & 0xFF == ord('q'):
+                    # Keep the window responsive while waiting for the next frame
+                    break
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            self.timer.dropped = captured.dropped + analyzed.dropped
+            if captured.dropped or analyzed.dropped:
+                print(f"Dropped {captured.dropped} captured and {analyzed.dropped} analyzed frames.")
 
-            if cv2.waitKey(10) & 0xFF == ord('q'):
-                break
+    # The analyze_* methods take the same keyword options as run()
+    def analyze_biceps_curl(self, **options):
+        return self.run(ExerciseDetector("biceps_curl"), **options)
+
+    def analyze_squat(self, **options):
+        return self.run(ExerciseDetector("squat"), **options)
+
+    def analyze_pushups(self, **options):
+        return self.run(ExerciseDetector("pushups"), **options)
 
-        self.release_camera()
+    def analyze_plank(self, **options):
+        return self.run(ExerciseDetector("plank"), **options)
 
-app = PostureAnalyzer()
\ No newline at end of file
+    def analyze_any(self, **options):
+        """Watch every exercise at once and show the one the user appears to be doing."""
+        return self.run(ExerciseEngine(), **options)
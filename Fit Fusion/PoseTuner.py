@@ -0,0 +1,245 @@
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import cv2
+
+from PoseBackend import create_pose_model
+
+# Tuned settings are kept per machine, keyed by host name
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pose_tuning.json")
+
+# Bundled photo of a person the candidates are timed on. Frames without anybody in them
+# only run the pose detector, not the landmark model, and would make every model look cheap.
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "180-push.jpg")
+
+# Settings are (model_complexity, (width, height)), both listed from the most to the least
+# accurate. The model complexity is tried first: the landmark model always sees a 256x256
+# crop, so it matters more than the capture resolution.
+RESOLUTIONS = ((1280, 720), (960, 540), (640, 480), (480, 360))
+MODEL_COMPLEXITIES = (2, 1, 0)
+
+
+def sample_frames(path=FIXTURE_PATH):
+    """
+    Loads the benchmark fixture, a BGR photo of a person, as a list of frames.
+
+    The same frame repeated is what a graph tracking somebody standing still sees:
+    the landmark model runs on every frame, the detector only on the first.
+    """
+    frame = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_4)
+    if frame is None:
+        raise FileNotFoundError(f"Pose tuning fixture {path} is missing.")
+    return [frame]
+
+
+class PoseTuner:
+    """
+    Picks the MediaPipe model complexity and capture resolution that reach a target FPS.
+
+    benchmark() times the per-frame preprocessing and ``pose.process`` cost of every
+    candidate on this machine and keeps the most accurate one that fits the frame budget.
+    The choice is saved to SETTINGS_PATH so later starts can simply load() it.
+    """
+
+    def __init__(self, target_fps=25, backend="solutions", resolutions=RESOLUTIONS, settings_path=SETTINGS_PATH):
+        """
+        Args:
+            target_fps (int): Frame rate the setting has to reach.
+            backend (str): Pose backend the candidates are timed on, see PoseBackend.
+            resolutions (tuple): Candidate capture sizes, largest first, e.g. only those
+                of the display's aspect ratio.
+            settings_path (str): JSON file the settings are saved in.
+        """
+        self.target_fps = target_fps
+        self.backend = backend
+        self.resolutions = tuple(tuple(resolution) for resolution in resolutions)
+        self.settings_path = settings_path
+        self.machine = platform.node() or "default"
+        self.results = {}
+
+    def load(self):
+        """
+        Returns the saved (model_complexity, (width, height)) for this machine and target
+        FPS, or None if it has not been tuned yet.
+        """
+        try:
+            with open(self.settings_path) as settings_file:
+                entry = json.load(settings_file).get(self.machine)
+        except (OSError, ValueError):
+            return None
+        if (not entry or entry.get("target_fps") != self.target_fps
+                or entry.get("backend", "solutions") != self.backend
+                or tuple(entry["resolution"]) not in self.resolutions):
+            return None
+        return entry["model_complexity"], tuple(entry["resolution"])
+
+    def save(self, setting):
+        """Store a (model_complexity, (width, height)) setting for this machine."""
+        try:
+            with open(self.settings_path) as settings_file:
+                settings = json.load(settings_file)
+        except (OSError, ValueError):
+            settings = {}
+        complexity, resolution = setting
+        settings[self.machine] = {
+            "model_complexity": complexity,
+            "resolution": list(resolution),
+            "target_fps": self.target_fps,
+            "backend": self.backend,
+            "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(self.settings_path, "w") as settings_file:
+            json.dump(settings, settings_file, indent=2)
+
+    def measure(self, complexity, resolution, frames, repeats=15):
+        """Average seconds per frame for one candidate, or None if its model cannot be loaded."""
+        try:
+            # Offline, so the tasks backend is timed on inference rather than on submitting frames
+            pose_model = create_pose_model(complexity, self.backend, offline=True)
+        except Exception as e:
+            print(f"Model complexity {complexity} unavailable: {e}")
+            return None
+
+        resized = [cv2.resize(frame, resolution) for frame in frames]
+        with pose_model:
+            # Warm up the graph before timing it
+            for frame in resized[:3]:
+                results = pose_model.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+            if results.pose_landmarks is None:
+                print(f"No pose found in the tuning fixture at {resolution[0]}x{resolution[1]}, "
+                      f"the timing only covers the detector.")
+
+            start = time.monotonic()
+            for i in range(repeats):
+                frame = cv2.flip(resized[i % len(resized)], 1)
+                pose_model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            return (time.monotonic() - start) / repeats
+
+    def benchmark(self, frames):
+        """
+        Times every candidate and saves the most accurate one within the frame budget.
+
+        Args:
+            frames (list[np.ndarray]): Sample BGR frames, see sample_frames().
+
+        Returns:
+            tuple: The chosen (model_complexity, (width, height)).
+        """
+        budget = 1.0 / self.target_fps
+        chosen = None
+        for complexity in MODEL_COMPLEXITIES:
+            for resolution in self.resolutions:
+                seconds = self.measure(complexity, resolution, frames)
+                if seconds is None:
+                    break
+                self.results[(complexity, resolution)] = seconds
+                if seconds <= budget:
+                    chosen = (complexity, resolution)
+                    break
+            if chosen is not None:
+                break
+
+        if chosen is None:
+            chosen = (MODEL_COMPLEXITIES[-1], self.resolutions[-1])
+        self.save(chosen)
+        return chosen
+
+    def tune(self, retune=False):
+        """Load the saved setting, benchmarking the machine first if there is none."""
+        setting = None if retune else self.load()
+        if setting is None:
+            setting = self.benchmark(sample_frames())
+        return setting
+
+    def runtime(self, setting, **options):
+        """A RuntimeTuner that starts from the given setting and saves through this tuner."""
+        return RuntimeTuner(self, setting, **options)
+
+
+class RuntimeTuner:
+    """
+    Adapts the setting while running to the load the machine is actually under.
+
+    Frame times are smoothed with an exponential moving average. Once it has stayed over
+    budget for ``patience`` frames in a row, the model complexity is lowered, or the
+    resolution once the lightest model is in use. Once it has stayed well under budget
+    for ``recover_patience`` frames, the last step down is undone, so a passing load
+    spike costs accuracy only while it lasts. Changes are made in memory; a setting is
+    only saved after it has held for ``persist_after`` frames.
+    """
+
+    def __init__(self, tuner, setting, patience=30, recover_patience=300, headroom=0.6, persist_after=1800,
+                 smoothing=0.1):
+        """
+        Args:
+            tuner (PoseTuner): Tuner whose budget applies and that saves the setting.
+            setting (tuple): The starting (model_complexity, (width, height)).
+            patience (int): Frames over budget before stepping down.
+            recover_patience (int): Frames under ``headroom`` times the budget before
+                stepping back up.
+            headroom (float): Fraction of the budget the frames have to stay under
+                before stepping back up.
+            persist_after (int): Frames a changed setting has to hold before it is saved.
+            smoothing (float): Weight of the newest frame in the moving average.
+        """
+        self.tuner = tuner
+        self.budget = 1.0 / tuner.target_fps
+        self.setting = setting
+        self.patience = patience
+        self.recover_patience = recover_patience
+        self.headroom = headroom
+        self.persist_after = persist_after
+        self.smoothing = smoothing
+        self.average = None
+        self.saved = setting
+        self._stepped_down = []
+        self._over_budget = 0
+        self._under_budget = 0
+        self._held = 0
+
+    def cheaper(self):
+        """The next cheaper setting, or None if this is already the cheapest."""
+        complexity, resolution = self.setting
+        if complexity > MODEL_COMPLEXITIES[-1]:
+            return complexity - 1, resolution
+        smaller = [candidate for candidate in self.tuner.resolutions
+                   if candidate[0] * candidate[1] < resolution[0] * resolution[1]]
+        return (complexity, smaller[0]) if smaller else None
+
+    def observe(self, seconds):
+        """
+        Feeds the processing time of one frame.
+
+        Returns:
+            tuple | None: The new (model_complexity, (width, height)) to switch to, or None.
+        """
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += self.smoothing * (seconds - self.average)
+
+        self._held += 1
+        if self.setting != self.saved and self._held >= self.persist_after:
+            self.tuner.save(self.setting)
+            self.saved = self.setting
+
+        self._over_budget = self._over_budget + 1 if self.average > self.budget else 0
+        self._under_budget = self._under_budget + 1 if self.average < self.budget * self.headroom else 0
+        if self._over_budget >= self.patience:
+            setting = self.cheaper()
+            if setting is not None:
+                self._stepped_down.append(self.setting)
+        elif self._under_budget >= self.recover_patience and self._stepped_down:
+            setting = self._stepped_down.pop()
+        else:
+            return None
+        self.average = None
+        self._over_budget = self._under_budget = 0
+        if setting is None:
+            return None
+        self.setting = setting
+        self._held = 0
+        return setting
@@ -0,0 +1,175 @@
+import multiprocessing
+import sys
+import threading
+import types
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from CameraManager import open_camera
+from FrameBus import FrameBus
+from PoseTracker import PostureAnalyzer, PresenceGate
+from PoseTuner import RESOLUTIONS
+
+# Process-wide worker handed out by shared_worker()
+_shared = None
+_shared_lock = threading.Lock()
+
+
+@contextmanager
+def _bare_main():
+    """
+    Hides the main script from processes spawned meanwhile.
+
+    A spawned child normally re-imports the parent's main script, here the whole GUI
+    with its PyQt, assistant and database imports. With an empty ``__main__`` it only
+    imports this module and the pose modules it needs. The swap is process-wide, so it
+    is only done on the main thread, see PoseWorker.start().
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _serve(bus_spec, source, model_complexity, backend, idle, tune, running, stopping):
+    """Worker process: capture and infer while ``running`` is set, publishing every frame."""
+    bus = FrameBus(**bus_spec)
+    analyzer = PostureAnalyzer(model_complexity, backend=backend)
+    if tune:
+        # Only capture sizes of the bus's shape, so frames are not stretched onto it
+        analyzer.auto_tune(resolutions=[(width, height) for width, height in RESOLUTIONS
+                                        if width * bus.height == height * bus.width] or [(bus.width, bus.height)])
+    # Load the model and run the first, slow inference before anybody is waiting for it
+    analyzer.pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+    analyzer.pose.reset()
+    try:
+        while not stopping.is_set():
+            if not running.wait(0.1):
+                continue
+            analyzer.cap = open_camera(source) if isinstance(source, int) else cv2.VideoCapture(source)
+            analyzer._pending_resolution = analyzer.resolution
+            analyzer.presence = PresenceGate() if idle else None
+            while running.is_set() and not stopping.is_set():
+                analyzer._apply_pending_resolution()
+                ret, frame = analyzer.read_frame()
+                if not ret:
+                    print("Failed to capture video.")
+                    running.clear()
+                    break
+                image, _ = analyzer.infer(frame)
+                bus.publish(image, analyzer.frame)
+            # Ends the process's only camera subscription, which releases the device
+            analyzer.release_camera(close_windows=False)
+            analyzer.pose.reset()
+    finally:
+        analyzer.pose.close()
+        bus.close()
+
+
+class PoseWorker:
+    """
+    Camera capture and pose inference in a process of their own.
+
+    Inference no longer competes for the GIL with the GUI, speech recognition and the
+    assistant: the worker process publishes each flipped frame and its landmarks on a
+    FrameBus in shared memory, and the GUI, recorders and exercise detectors read them
+    from there in place. The process is started once and keeps its graph loaded;
+    resume() and pause() only open and release the camera. Starting the process is
+    left to the main (GUI) thread, other threads only resume and pause it.
+    """
+
+    def __init__(self, source=0, width=640, height=480, model_complexity=1, backend="solutions", idle=True,
+                 tune=True):
+        """
+        Args:
+            source (int | str): Camera index or video path.
+            width (int): Width of the frames on the bus.
+            height (int): Height of the frames on the bus.
+            model_complexity (int): MediaPipe Pose model complexity, 0, 1 or 2.
+            backend (str): Pose backend, see PoseBackend.BACKENDS.
+            idle (bool): Pause full inference while nobody is in view, see PresenceGate.
+            tune (bool): Pick the model complexity and capture resolution for this
+                machine instead of ``model_complexity``, see PostureAnalyzer.auto_tune().
+        """
+        self.source = source
+        self.size = (width, height)
+        self.options = (model_complexity, backend, idle, tune)
+        self.bus = None
+        self.process = None
+        # Spawned rather than forked, a forked MediaPipe graph crashes the child
+        self._context = multiprocessing.get_context("spawn")
+        self._running = self._context.Event()
+        self._stopping = self._context.Event()
+
+    def start(self):
+        """
+        Start the worker process, which loads the model and waits for resume().
+
+        Idempotent while the process runs; a process that died is replaced by a new one
+        on a new bus, see failed. Call it from the main thread only.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("The pose worker process can only be started from the main thread.")
+        if self.failed:
+            print(f"Pose worker exited unexpectedly with code {self.process.exitcode}, restarting it.")
+            self._discard()
+        if self.process is None:
+            self._stopping.clear()
+            self.bus = FrameBus(*self.size)
+            self.process = self._context.Process(
+                target=_serve, args=(self.bus.spec, self.source, *self.options, self._running, self._stopping),
+                daemon=True)
+            with _bare_main():
+                self.process.start()
+        return self
+
+    def resume(self):
+        """Open the camera and start publishing frames once the process started by start() is up."""
+        self._running.set()
+
+    def pause(self):
+        """Stop publishing and release the camera device; the model stays loaded."""
+        self._running.clear()
+
+    @property
+    def active(self):
+        """Whether frames are being published; False after the source failed or ended."""
+        return self._running.is_set() and self.process is not None and self.process.is_alive()
+
+    @property
+    def failed(self):
+        """Whether the process died without being closed; start() restarts it."""
+        return self.process is not None and not self.process.is_alive()
+
+    def close(self, timeout=5.0):
+        """Stop the worker process and free the bus."""
+        if self.process is None:
+            return
+        self._running.clear()
+        self._stopping.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._discard()
+
+    def _discard(self):
+        self.process = None
+        self.bus.close()
+        self.bus = None
+
+
+def shared_worker(**options):
+    """
+    The process-wide PoseWorker, created (but not started) on first use.
+
+    Later calls return the same worker and ignore their arguments.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PoseWorker(**options)
+        return _shared
@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from CameraManager import open_camera
+from PosePool import PosePool
+from PoseTracker import PostureAnalyzer, ExerciseDetector, ExerciseEngine, LatestFrameQueue, BufferRing
+
+
+class Station:
+    """
+    One camera source served by a SessionHost, with its own analyzer and exercise state.
+
+    Attributes:
+        latest (tuple | None): ``(image, results, landmarks)`` of the last analyzed frame.
+            The image buffer is reused a few frames later, so copy it to keep it.
+    """
+
+    def __init__(self, name, source, exercise=None, annotate=True):
+        """
+        Args:
+            name (str): Station name used in the results.
+            source (int | str): Camera index or video path for ``cv2.VideoCapture``.
+            exercise (str, optional): EXERCISES key to track. By default every exercise is
+                watched and the one being done is detected.
+            annotate (bool): Draw the overlay on the analyzed frames.
+        """
+        self.name = name
+        self.source = source
+        self.tracker = ExerciseDetector(exercise) if exercise else ExerciseEngine()
+        self.annotate = annotate
+        self.captured = LatestFrameQueue()
+        self.analyzer = None
+        self.latest = None
+        self.running = False
+        self._buffers = BufferRing()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def capture(self, ready, stop):
+        """
+        Read frames until stopped, scheduling the station whenever a new frame is waiting.
+
+        Video files are read at their own frame rate, like a camera delivers frames;
+        read as fast as possible, nearly all of their frames would be dropped as stale.
+        """
+        # Stations on the same camera index share one handle
+        live = isinstance(self.source, int)
+        cap = open_camera(self.source) if live else cv2.VideoCapture(self.source)
+        self.running = cap.isOpened()
+        if not self.running:
+            print(f"{self.name}: could not open {self.source}.")
+        fps = 0.0 if live or not self.running else cap.get(cv2.CAP_PROP_FPS)
+        frame_interval = 1.0 / fps if fps > 0 else 1.0 / 30
+        next_frame = time.monotonic()
+        try:
+            while self.running and not stop.is_set():
+                if not live:
+                    next_frame += frame_interval
+                    delay = next_frame - time.monotonic()
+                    if delay > 0 and stop.wait(delay):
+                        break
+                ret, frame = cap.read(self._buffers.current())
+                if not ret:
+                    print(f"{self.name}: failed to capture video.")
+                    break
+                self._buffers.store(frame)
+                with self._lock:
+                    self.captured.put((frame, time.monotonic()))
+                    if not self._scheduled:
+                        self._scheduled = True
+                        ready.put(self)
+        finally:
+            self.running = False
+            cap.release()
+
+    def reschedule(self, ready):
+        """After processing, queue the station again only if another frame arrived meanwhile."""
+        with self._lock:
+            if len(self.captured):
+                ready.put(self)
+            else:
+                self._scheduled = False
+
+    def process(self, pose_model, frame, captured_at):
+        """Analyze one frame with a Pose graph borrowed from the host's pool."""
+        if self.analyzer is None:
+            self.analyzer = PostureAnalyzer(pose_model=pose_model)
+        else:
+            self.analyzer.pose = pose_model
+
+        image, results = self.analyzer.infer(frame, self.tracker, timestamp=captured_at)
+        landmarks = self.analyzer.frame.data.copy() if self.analyzer.frame.detected else None
+        if self.annotate:
+            self.analyzer.annotate(image, landmarks, self.tracker)
+        self.analyzer.timer.dropped = self.captured.dropped
+        self.analyzer.timer.frame_done(captured_at)
+        self.latest = (image, results, landmarks)
+
+    def result(self):
+        """Exercise summary, FPS and latency for this station."""
+        timer = self.analyzer.timer if self.analyzer is not None else None
+        result = {
+            "source": self.source,
+            "running": self.running,
+            "summary": self.tracker.summary(),
+            "fps": timer.fps() if timer else 0.0,
+            "frames": timer.frames if timer else 0,
+            "dropped": self.captured.dropped,
+        }
+        latency = timer.percentiles("latency") if timer else None
+        if latency is not None:
+            result["latency_ms"] = {"p50": latency[0], "p95": latency[1], "p99": latency[2]}
+        if isinstance(self.tracker, ExerciseEngine):
+            result["exercise"] = self.tracker.guess_exercise()
+        return result
+
+
+class SessionHost:
+    """
+    Serves several camera stations from one process.
+
+    Every station captures on its own thread. A fixed number of inference threads, each
+    borrowing a graph from a shared PosePool, analyze whichever stations have a fresh
+    frame waiting; stale frames are dropped per station instead of queuing up.
+    """
+
+    def __init__(self, sources, exercise=None, workers=None, annotate=True, callback=None):
+        """
+        Args:
+            sources (dict | list): Station name to camera source, or a list of sources
+                named station-1, station-2, ...
+            exercise (str, optional): EXERCISES key every station tracks; see Station.
+            workers (int, optional): Inference threads and Pose graphs. Defaults to the
+                CPU count, but never more than the number of stations.
+            annotate (bool): Draw the overlay on analyzed frames.
+            callback (callable, optional): Called as ``callback(station)`` after each
+                analyzed frame, from an inference thread.
+        """
+        if not isinstance(sources, dict):
+            sources = {f"station-{i + 1}": source for i, source in enumerate(sources)}
+        self.stations = {name: Station(name, source, exercise, annotate) for name, source in sources.items()}
+        self.workers = min(workers or os.cpu_count() or 1, len(self.stations))
+        self.callback = callback
+        self.pool = None
+        self._ready = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Open every camera and start the capture and inference threads."""
+        self._stop.clear()
+        if self.pool is None:
+            self.pool = PosePool(self.workers)
+        self._threads = [threading.Thread(target=station.capture, args=(self._ready, self._stop), daemon=True)
+                         for station in self.stations.values()]
+        self._threads += [threading.Thread(target=self._inference_worker, daemon=True)
+                          for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _inference_worker(self):
+        while not self._stop.is_set():
+            try:
+                station = self._ready.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                item = station.captured.get(timeout=0)
+                if item is not None:
+                    with self.pool.borrow(station.name) as pose_model:
+                        station.process(pose_model, *item)
+                    if self.callback is not None:
+                        self.callback(station)
+            except Exception as e:
+                print(f"{station.name}: analysis failed: {e!r}")
+            finally:
+                # Even after a failure, or the station would never be scheduled again
+                station.reschedule(self._ready)
+
+    def stop(self):
+        """Stop every thread, release the cameras and close the Pose graphs."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def results(self):
+        """Per-station results, see Station.result()."""
+        return {name: station.result() for name, station in self.stations.items()}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve several pose-tracking stations from one process.")
+    parser.add_argument("sources", nargs="+", help="Camera indexes or video files, one per station")
+    parser.add_argument("-e", "--exercise", default=None, help="Exercise every station tracks")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of inference threads")
+    parser.add_argument("-i", "--interval", type=float, default=5.0, help="Seconds between result reports")
+    args = parser.parse_args()
+
+    sources = [int(source) if source.isdigit() else source for source in args.sources]
+    with SessionHost(sources, args.exercise, args.workers, annotate=False) as host:
+        try:
+            while True:
+                time.sleep(args.interval)
+                print(json.dumps(host.results()))
+                if not any(station.running for station in host.stations.values()):
+                    break
+        except KeyboardInterrupt:
+            pass
@@ -1,24 +1,130 @@
 import sys
+import threading
+import time
 import cv2
 import numpy as np
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel
+from CameraManager import open_camera
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, QSizePolicy
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 
+
+class FramePresenter:
+    """
+    Turns BGR frames into display-sized QImages off the GUI thread.
+
+    Frames are scaled (or copied, when already the right size) into two alternating
+    buffers and wrapped in a Format_BGR888 QImage without any color conversion. A
+    buffer is written again two calls later, so call to_qimage() only once the GUI
+    has shown the previous image.
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self._buffers = [None, None]
+        self._current = 0
+
+    def set_size(self, width, height):
+        """Display size the frames are fitted into, keeping their aspect ratio. Safe from any thread."""
+        self.size = (width, height)
+
+    def _fit(self, frame):
+        h, w = frame.shape[:2]
+        if self.size is None:
+            return w, h
+        scale = min(self.size[0] / w, self.size[1] / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def scale(self, frame):
+        """Scale (or copy) a BGR frame into the next buffer and return it, e.g. to draw on."""
+        width, height = self._fit(frame)
+        buffer = self._buffers[self._current]
+        if buffer is None or buffer.shape != (height, width, 3):
+            buffer = self._buffers[self._current] = np.empty((height, width, 3), dtype=np.uint8)
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=buffer, interpolation=cv2.INTER_AREA)
+        self._current ^= 1
+        return buffer
+
+    @staticmethod
+    def wrap(buffer):
+        """A QImage sharing the memory of a buffer returned by scale()."""
+        return QImage(buffer.data, buffer.shape[1], buffer.shape[0], buffer.strides[0], QImage.Format_BGR888)
+
+    def to_qimage(self, frame):
+        """Wrap a scaled copy of a BGR frame in a QImage that shares the buffer's memory."""
+        return self.wrap(self.scale(frame))
+
+
 class VideoThread(QThread):
-    change_pixmap_signal = pyqtSignal(np.ndarray)
+    """
+    Captures camera frames at a target rate and hands the GUI only the latest one.
+
+    A frame is emitted only after the GUI has called frame_shown() for the previous
+    one; frames captured meanwhile are dropped. Frames are emitted as display-sized
+    QImages built by self.presenter, and capture and presentation reuse their buffers,
+    so memory stays flat however long the session runs.
+    """
+    change_pixmap_signal = pyqtSignal(QImage)
+
+    def __init__(self, source=0, target_fps=30, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.target_fps = target_fps
+        self.presenter = FramePresenter()
+        self.dropped = 0
+        self._running = False
+        self._gui_ready = threading.Event()
 
     def run(self):
-        cap = cv2.VideoCapture(0)
-        while True:
-            ret, frame = cap.read()
-            if ret:
-                self.change_pixmap_signal.emit(frame)
+        # Camera indexes go through the shared camera, which other widgets may be reading too
+        cap = open_camera(self.source) if isinstance(self.source, int) else cv2.VideoCapture(self.source)
+        cap.set(cv2.CAP_PROP_FPS, self.target_fps)
+        frame = None
+        interval = 1.0 / self.target_fps
+        next_frame = time.monotonic()
+        self._running = True
+        self._gui_ready.set()
+        try:
+            while self._running:
+                ret, frame = cap.read(frame)
+                if not ret:
+                    print("Failed to capture video.")
+                    break
+                if self._gui_ready.is_set():
+                    self._gui_ready.clear()
+                    self.change_pixmap_signal.emit(self.presenter.to_qimage(frame))
+                else:
+                    self.dropped += 1
+
+                next_frame += interval
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.monotonic()
+        finally:
+            self._running = False
+            cap.release()
+
+    def frame_shown(self):
+        """Call from the GUI once the last emitted frame has been painted."""
+        self._gui_ready.set()
+
+    def stop(self):
+        """Stop capturing and wait until the camera is released."""
+        self._running = False
+        self.wait()
 
 class VideoWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.image_label = QLabel(self)
+        self.image_label.setAlignment(Qt.AlignCenter)
+        # Let the label shrink below the current frame size when the window does
+        self.image_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(self.image_label)
         self.setLayout(self.layout)
@@ -27,18 +133,14 @@ class VideoWidget(QWidget):
         self.thread.change_pixmap_signal.connect(self.update_image)
         self.thread.start()
 
-    def update_image(self, cv_img):
-        """Updates the image_label with a new opencv image"""
-        qt_img = self.convert_cv_qt(cv_img)
-        self.image_label.setPixmap(qt_img)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.thread.presenter.set_size(self.image_label.width(), self.image_label.height())
 
-    def convert_cv_qt(self, cv_img):
-        """Convert from an opencv image to QPixmap"""
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QPixmap.fromImage(QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888))
-        return convert_to_Qt_format
+    def update_image(self, qt_img):
+        """Updates the image_label with a frame already scaled on the video thread"""
+        self.image_label.setPixmap(QPixmap.fromImage(qt_img))
+        self.thread.frame_shown()
 
 class App(QMainWindow):
     def __init__(self):
@@ -55,6 +157,10 @@ class App(QMainWindow):
         # Add more tabs as needed
         self.tabs.addTab(QWidget(), "Other Tab")
 
+    def closeEvent(self, event):
+        self.video_tab.thread.stop()
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     main_app = App()